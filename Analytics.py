@@ -0,0 +1,206 @@
+import argparse
+
+import numpy as np
+
+from DecisionLog import *
+
+CHUNK_RECORDS = 1 << 22  # Records per memory-mapped chunk (about 60 MB)
+
+
+class GroupCounts:
+    """Counts and weighted sums over (group, value) pairs with NumPy bincount.
+    Columns cover the values seen so far (starting at `offset`) and grow when a chunk
+    brings new values. Aggregates of separate logs or processes combine with merge().
+    """
+
+    def __init__(self, n_groups: int, n_sums: int = 0):
+        self.n_groups = n_groups
+        self.offset = 0
+        self.counts = np.zeros((n_groups, 0), dtype=np.int64)
+        self.sums = np.zeros((n_sums, n_groups, 0))
+
+    @property
+    def values(self) -> np.ndarray:
+        return np.arange(self.offset, self.offset + self.counts.shape[1])
+
+    def fit(self, low: int, high: int):
+        """Grow the columns to cover values low..high"""
+        width = self.counts.shape[1]
+        if width:
+            low, high = min(low, self.offset), max(high, self.offset + width - 1)
+        new_width = high - low + 1
+        if width == new_width:
+            return
+        shift = self.offset - low if width else 0
+        counts = np.zeros((self.n_groups, new_width), dtype=np.int64)
+        counts[:, shift:shift + width] = self.counts
+        sums = np.zeros(self.sums.shape[:2] + (new_width,))
+        sums[:, :, shift:shift + width] = self.sums
+        self.counts, self.sums, self.offset = counts, sums, low
+
+    def add(self, groups: np.ndarray, values: np.ndarray, *weights: np.ndarray):
+        if len(values) == 0:
+            return
+        values = values.astype(np.int64)
+        self.fit(int(values.min()), int(values.max()))
+        width = self.counts.shape[1]
+        index = groups.astype(np.int64) * width + (values - self.offset)
+        size = self.n_groups * width
+        self.counts += np.bincount(index, minlength=size).reshape(self.n_groups, width)
+        for i, w in enumerate(weights):
+            self.sums[i] += np.bincount(index, weights=w, minlength=size).reshape(self.n_groups, width)
+
+    def merge(self, other: "GroupCounts"):
+        if other.counts.shape[1] == 0:
+            return
+        self.fit(other.offset, other.offset + other.counts.shape[1] - 1)
+        start = other.offset - self.offset
+        end = start + other.counts.shape[1]
+        self.counts[:, start:end] += other.counts
+        self.sums[:, :, start:end] += other.sums
+
+    def mean(self, i: int = 0) -> np.ndarray:
+        """sums[i] / counts, NaN where there were no samples"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sums[i] / self.counts
+
+
+def histogram_percentile(values: np.ndarray, counts: np.ndarray, q: float) -> float:
+    """np.percentile (linear interpolation) of the samples values repeated counts times,
+    without expanding them
+    """
+    cumulative = np.cumsum(counts)
+    position = q / 100 * (cumulative[-1] - 1)
+    below, above = int(np.floor(position)), int(np.ceil(position))
+    low = values[np.searchsorted(cumulative, below, side="right")]
+    high = values[np.searchsorted(cumulative, above, side="right")]
+    return low + (high - low) * (position - below)
+
+
+def chunks(records, chunk_records: int = CHUNK_RECORDS):
+    """Consecutive slices of a memory-mapped array, only one chunk is paged in at a time"""
+    for start in range(0, len(records), chunk_records):
+        yield np.asarray(records[start:start + chunk_records])
+
+
+def seat_strategies(results, n_seats: int, chunk_records: int = CHUNK_RECORDS) -> np.ndarray:
+    """Lookup table: strategy id of (game, seat) at index game * n_seats + seat"""
+    n_games = int(results["game"][-1]) + 1 if len(results) else 0
+    table = np.zeros(n_games * n_seats, dtype=np.uint16)
+    for chunk in chunks(results, chunk_records):
+        table[chunk["game"].astype(np.int64) * n_seats + chunk["seat"]] = chunk["strategy"]
+    return table
+
+
+def analyze_results(results, n_strategies: int, chunk_records: int = CHUNK_RECORDS) -> dict:
+    """Score distribution, seat bias and head-to-head matrix from game results.
+    Results are stored game by game, so every pair of players in a game is
+    (row i, row i + k) for some k < number of seats with the same game id.
+    """
+    n_seats = int(results["seat"].max()) + 1 if len(results) else 1
+    scores = GroupCounts(n_strategies)
+    seats = GroupCounts(1, n_sums=2)  # sums: score, wins
+    wins = np.zeros((n_strategies, n_strategies), dtype=np.int64)
+    games = np.zeros((n_strategies, n_strategies), dtype=np.int64)
+
+    for start in range(0, len(results), chunk_records):
+        # Read n_seats - 1 extra rows so pairs crossing the chunk end are found
+        rows = np.asarray(results[start:start + chunk_records + n_seats - 1])
+        own = rows[:chunk_records]
+        scores.add(own["strategy"], own["score"])
+        seats.add(np.zeros(len(own), dtype=np.int64), own["seat"], own["score"], own["rank"] == 0)
+
+        for k in range(1, n_seats):
+            a, b = own[:len(rows) - k], rows[k:k + len(own)]
+            same = a["game"] == b["game"]
+            a, b = a[same], b[same]
+            for x, y in [(a, b), (b, a)]:
+                pair = x["strategy"].astype(np.int64) * n_strategies + y["strategy"]
+                wins += np.bincount(pair[x["score"] > y["score"]],
+                                    minlength=n_strategies ** 2).reshape(n_strategies, n_strategies)
+                games += np.bincount(pair, minlength=n_strategies ** 2).reshape(n_strategies, n_strategies)
+
+    return {"scores": scores, "seats": seats, "head_to_head_wins": wins, "head_to_head_games": games,
+            "n_seats": n_seats}
+
+
+def analyze_decisions(decisions, strategy_of: np.ndarray, n_seats: int, n_strategies: int,
+                      chunk_records: int = CHUNK_RECORDS) -> dict:
+    """Take rate by pile size and cubes held by round, per strategy.
+    Forced takes (no cubes left) are left out of the take rate.
+    """
+    take_rate = GroupCounts(n_strategies, n_sums=1)  # sums: takes
+    hoarding = GroupCounts(n_strategies, n_sums=1)  # sums: cubes held
+    for chunk in chunks(decisions, chunk_records):
+        strategy = strategy_of[chunk["game"].astype(np.int64) * n_seats + chunk["seat"]]
+        voluntary = chunk["choice"] != FORCED
+        take_rate.add(strategy[voluntary], chunk["pile"][voluntary], chunk["choice"][voluntary] == TAKE)
+        hoarding.add(strategy, chunk["round"], chunk["cubes"])
+    return {"take_rate": take_rate, "hoarding": hoarding}
+
+
+def analyze(path: str, chunk_records: int = CHUNK_RECORDS) -> dict:
+    """All statistics of the decision log at path (written by DecisionRecorder)"""
+    names = read_strategy_names(path)
+    results = read_results(path)
+    stats = analyze_results(results, len(names), chunk_records)
+    n_seats = stats["n_seats"]
+    strategy_of = seat_strategies(results, n_seats, chunk_records)
+    # Decisions of games without results (a recorder that was not closed) are skipped
+    decisions = read_decisions(path)
+    n_complete = int(np.searchsorted(decisions["game"], len(strategy_of) // n_seats))
+    stats.update(analyze_decisions(decisions[:n_complete], strategy_of, n_seats, len(names), chunk_records))
+    stats["names"] = names
+    return stats
+
+
+def print_analysis(stats: dict, max_columns: int = 12):
+    names = stats["names"]
+
+    def curve(counts: GroupCounts, row: int) -> str:
+        mean = counts.mean()[row]
+        cells = [f"{v}:{m:.2f}" for v, m in zip(counts.values, mean) if not np.isnan(m)]
+        return " ".join(cells[:max_columns])
+
+    print("=== Scores ===")
+    scores = stats["scores"]
+    for i, name in enumerate(names):
+        n = scores.counts[i].sum()
+        if not n:
+            continue
+        counts = scores.counts[i]
+        mean = (scores.values * counts).sum() / n
+        std = np.sqrt((counts * (scores.values - mean) ** 2).sum() / n)
+        p10, p50, p90 = (histogram_percentile(scores.values, counts, q) for q in (10, 50, 90))
+        print(f"{name:32} | Games: {n:8} | Mean: {mean:7.2f} | Std: {std:6.2f} "
+              f"| P10/P50/P90: {p10:.0f}/{p50:.0f}/{p90:.0f}")
+
+    print("\n=== Seat bias ===")
+    seats = stats["seats"]
+    for seat, n, score, win in zip(seats.values, seats.counts[0], seats.sums[0][0], seats.sums[1][0]):
+        if n:
+            print(f"Seat {seat} | Games: {n:8} | Mean score: {score / n:7.2f} | Win rate: {win / n:.2%}")
+
+    print("\n=== Take rate by pile size ===")
+    for i, name in enumerate(names):
+        print(f"{name:32} | {curve(stats['take_rate'], i)}")
+
+    print("\n=== Cubes held by round ===")
+    for i, name in enumerate(names):
+        print(f"{name:32} | {curve(stats['hoarding'], i)}")
+
+    print("\n=== Head to head win rate (row beats column) ===")
+    wins, games = stats["head_to_head_wins"], stats["head_to_head_games"]
+    short = [name.replace("Strategy", "")[:10] for name in names]
+    print(" " * 32 + " ".join(f"{s:>10}" for s in short))
+    for i, name in enumerate(names):
+        cells = [f"{wins[i, j] / games[i, j]:10.2%}" if games[i, j] else f"{'-':>10}" for j in range(len(names))]
+        print(f"{name:32}" + " ".join(cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strategy statistics from a decision log (see DecisionLog)")
+    parser.add_argument("log", help="Decision log written by DecisionRecorder (e.g. StrategyEvaluator.py --log).")
+    parser.add_argument("--chunk", type=int, default=CHUNK_RECORDS, help=f"Records per chunk (default = {CHUNK_RECORDS}).")
+    args = parser.parse_args()
+    print_analysis(analyze(args.log, args.chunk))
@@ -1,12 +1,10 @@
 from Strategy import *
 from Game import *
 import Player
-import random
-import json
-import matplotlib.pyplot as plt
 
-# Import your GA methods here
-from Arena import genetic_algorithm, save_best_params  # Replace with actual module
+import argparse
+
+from Training import genetic_algorithm, coevolve, save_best_params, plot_history, get_checkpoint_filename
 
 # Strategies and param spaces to train
 STRATEGY_TRAINING_CONFIGS = [
@@ -31,7 +29,8 @@ STRATEGY_TRAINING_CONFIGS = [
 		"class": CollectorStrategy,
 		"param_template": {
 			"cutoff": (10, 30),
-		}
+		},
+		"integer_params": ("cutoff",)
 	},
 	{
 		"name": "ChaoticStrategy",
@@ -47,7 +46,8 @@ STRATEGY_TRAINING_CONFIGS = [
 		"param_template": {
 			"low_cube_threshold": (1, 5),
 			"pile_threshold": (0, 4),
-		}
+		},
+		"integer_params": ("low_cube_threshold",)
 	},
 ]
 
@@ -73,34 +73,31 @@ def run_training():
 			param_template=config["param_template"],
 			population_size=POPULATION_SIZE,
 			generations=GENERATIONS,
-			seed=SEED
+			seed=SEED,
+			checkpoint=get_checkpoint_filename(config["class"])
 		)
 
 		save_best_params(best)
-
-		# Plot results
-		plt.figure(figsize=(10, 4))
-		for param, values in param_history.items():
-			plt.plot(values, label=param)
-		plt.title(f"{config['name']} - Parameter Evolution")
-		plt.xlabel("Generation")
-		plt.ylabel("Value")
-		plt.legend()
-		plt.grid(True)
-		plt.tight_layout()
-		plt.show()
-
-		# Plot score history
-		plt.figure(figsize=(10, 3))
-		plt.plot(score_history, label="Best Score", color="black")
-		plt.title(f"{config['name']} - Score Over Generations")
-		plt.xlabel("Generation")
-		plt.ylabel("Score")
-		plt.grid(True)
-		plt.tight_layout()
-		plt.show()
+		plot_history(param_history, score_history, title=config["name"])
 
 		print("Final best:", best)
 
+def run_coevolution(games_per_individual=4, workers=None):
+	"""Train all strategies together in mixed games (see Training.coevolve)"""
+	results = coevolve(STRATEGY_TRAINING_CONFIGS, POPULATION_SIZE, GENERATIONS, games_per_individual, SEED, workers)
+	for name, (best, param_history, score_history) in results.items():
+		save_best_params(best, metadata={"mode": "coevolution", "generations": GENERATIONS, "seed": SEED})
+		plot_history(param_history, score_history, title=name)
+		print(f"Final best {name}:", best)
+
 if __name__ == "__main__":
-	run_training()
+	parser = argparse.ArgumentParser(description="Train the params of every strategy")
+	parser.add_argument("--coevolve", action="store_true", help="Evolve all strategies together in mixed games.")
+	parser.add_argument("--games", type=int, default=4, help="Games per individual per generation with --coevolve (default = 4).")
+	parser.add_argument("--workers", type=int, default=None, help="Worker processes with --coevolve.")
+	args = parser.parse_args()
+
+	if args.coevolve:
+		run_coevolution(args.games, args.workers)
+	else:
+		run_training()
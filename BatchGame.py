@@ -0,0 +1,193 @@
+import numpy as np
+from typing import List
+
+from Strategy import *
+
+
+class BatchGame:
+    """Simulate many games with the same seating in lockstep.
+
+    All state lives in NumPy arrays indexed by game:
+    decks   (n_games, n_rounds)       numbers in draw order
+    cubes   (n_games, n_players)      cubes held by each seat
+    pile    (n_games,)                cubes in the pile of the current round
+    owned   (n_games, n_players, W)   owned[g, s, n - lowest_number + 1] is True if
+                                      seat s owns number n. Column 0 and W-1 are
+                                      padding so neighbours can be read without bounds checks.
+    turn    (n_games,)                same meaning as Game.turn_counter
+
+    The rules follow Game.step exactly, so for deterministic strategies the final
+    scores are identical to running Game.play on the same decks.
+    """
+
+    def __init__(
+            batch,
+            strategies: List[Strategy],
+            n_games: int,
+            n_starting_cubes_per_player: int,
+            lowest_number: int,
+            highest_number: int,
+            n_numbers_to_remove: int = 0,
+            seed = None,
+            decks = None
+        ):
+            batch.strategies = strategies
+            batch.choice_functions = [get_vectorized_choice(s) for s in strategies]
+            batch.n_games = n_games
+            batch.n_players = len(strategies)
+            batch.lowest_number = lowest_number
+            batch.highest_number = highest_number
+            batch.n_numbers_to_remove = n_numbers_to_remove
+            batch.rng = np.random.default_rng(seed)
+
+            span = highest_number - lowest_number
+            if decks is None:
+                numbers = np.tile(np.arange(lowest_number, highest_number), (n_games, 1))
+                decks = batch.rng.permuted(numbers, axis=1)[:, :span - n_numbers_to_remove]
+            batch.decks = np.asarray(decks, dtype=np.int64)
+            if batch.decks.shape[0] != n_games:
+                raise ValueError(f"Expected {n_games} decks, got {batch.decks.shape[0]}")
+
+            batch.cubes = np.full((n_games, batch.n_players), n_starting_cubes_per_player, dtype=np.int64)
+            batch.pile = np.zeros(n_games, dtype=np.int64)
+            batch.owned = np.zeros((n_games, batch.n_players, span + 2), dtype=bool)
+            batch.turn = np.zeros(n_games, dtype=np.int64)
+            batch.num = None
+            batch.round_counter = 0
+            batch.turn_counter = 0  # Total turns simulated across all games
+
+    @property
+    def n_rounds(batch) -> int:
+        return batch.decks.shape[1]
+
+    def column(batch, numbers):
+        """Column in `owned` that holds the given number(s)"""
+        return numbers - batch.lowest_number + 1
+
+    def step(batch):
+        """
+        Simulate one round in every game
+        """
+        num = batch.decks[:, batch.round_counter]
+        batch.num = num
+        batch.round_counter += 1
+        batch.pile[:] = 0
+
+        active = np.arange(batch.n_games)
+        while active.size:
+            batch.turn[active] += 1
+            batch.turn_counter += active.size
+            seat = batch.turn[active] % batch.n_players
+
+            # Players without cubes are forced to take
+            take = batch.cubes[active, seat] == 0
+            for s, choose in enumerate(batch.choice_functions):
+                deciding = (seat == s) & ~take
+                if deciding.any():
+                    take[deciding] = choose(batch, batch.strategies[s], active[deciding], s)
+
+            payers = active[~take]
+            batch.cubes[payers, seat[~take]] -= 1
+            batch.pile[payers] += 1
+
+            takers = active[take]
+            taker_seats = seat[take]
+            batch.owned[takers, taker_seats, batch.column(num[takers])] = True
+            batch.cubes[takers, taker_seats] += batch.pile[takers]
+            batch.pile[takers] = 0
+
+            active = payers
+        batch.num = None
+
+    def play(batch):
+        while batch.round_counter < batch.n_rounds:
+            batch.step()
+        return batch.scores
+
+    @property
+    def ladder_start_sum(batch):
+        """Sum of the first number of every ladder, shape (n_games, n_players)"""
+        starts = batch.owned[:, :, 1:] & ~batch.owned[:, :, :-1]
+        values = np.arange(batch.lowest_number, batch.highest_number + 1)
+        return starts @ values
+
+    @property
+    def scores(batch):
+        """Same as Player.score for every seat, shape (n_games, n_players)"""
+        return 95 - batch.ladder_start_sum + batch.cubes
+
+
+# === Vectorized strategies ===
+# Each function gets the games (indices) where `seat` has to decide and returns
+# a boolean array that is True where the seat takes the number.
+
+def owns_within(batch, games, seat, radius):
+    """True where the seat owns a number n with abs(n - num) <= radius"""
+    hit = np.zeros(games.size, dtype=bool)
+    if radius < 0:
+        return hit
+    radius = min(int(radius), batch.highest_number - batch.lowest_number)
+    last = batch.owned.shape[2] - 1
+    col = batch.column(batch.num[games])
+    for offset in range(-radius, radius + 1):
+        c = np.clip(col + offset, 0, last)
+        hit |= batch.owned[games, seat, c]
+    return hit
+
+def owns_adjacent(batch, games, seat):
+    col = batch.column(batch.num[games])
+    return batch.owned[games, seat, col - 1] | batch.owned[games, seat, col + 1]
+
+def ladder_builder_choice(batch, strategy, games, seat):
+    gap = strategy.params.get("gap_weight", 1)
+    extension_gap = strategy.params.get("extension_gap", 2)
+    pile_threshold = strategy.params.get("pile_threshold", 1)
+    take = owns_within(batch, games, seat, gap)
+    extend = batch.pile[games] > pile_threshold
+    if extend.any():
+        take |= extend & owns_within(batch, games, seat, extension_gap)
+    return take
+
+def collector_choice(batch, strategy, games, seat):
+    cutoff = strategy.params.get("cutoff", (batch.lowest_number + batch.highest_number) // 2)
+    return owns_adjacent(batch, games, seat) | (batch.num[games] < cutoff)
+
+def chaotic_choice(batch, strategy, games, seat):
+    r = batch.rng.random(games.size)
+    yolo = strategy.params.get("yolo_chance", 0.1)
+    pay = strategy.params.get("pay_chance", 0.5)
+    return (r < yolo) | (r >= pay)
+
+def risk_threshold_choice(batch, strategy, games, seat):
+    risk_multiplier = strategy.params.get("risk_multiplier", 0.03)
+    threshold_to_take = risk_multiplier * batch.pile[games]
+    return owns_adjacent(batch, games, seat) | (batch.rng.random(games.size) < threshold_to_take)
+
+def cube_conserver_choice(batch, strategy, games, seat):
+    low = batch.cubes[games, seat] <= strategy.params.get("low_cube_threshold", 2)
+    return ~low & (batch.pile[games] >= strategy.params.get("pile_threshold", 2))
+
+def pile_snatcher_choice(batch, strategy, games, seat):
+    return batch.pile[games] >= strategy.params.get("snatch_threshold", 3)
+
+def greedy_ladder_extension_choice(batch, strategy, games, seat):
+    high = batch.pile[games] >= strategy.params.get("high_pile_threshold", 4)
+    return owns_adjacent(batch, games, seat) | high
+
+VECTORIZED_CHOICES = {
+    LadderBuilderStrategy: ladder_builder_choice,
+    CollectorStrategy: collector_choice,
+    ChaoticStrategy: chaotic_choice,
+    RiskThresholdStrategy: risk_threshold_choice,
+    CubeConserverStrategy: cube_conserver_choice,
+    PileSnatcherStrategy: pile_snatcher_choice,
+    GreedyLadderExtensionStrategy: greedy_ladder_extension_choice,
+}
+
+def get_vectorized_choice(strategy: Strategy):
+    """Vectorized choice function for strategy, TypeError if there is none
+    (callers can catch it and play those games with Game instead)"""
+    choice = VECTORIZED_CHOICES.get(type(strategy))
+    if choice is None:
+        raise TypeError(f"No vectorized version of {strategy.name}")
+    return choice
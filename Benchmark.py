@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from Main import ALL_STRATEGIES
+from Game import *
+import Player
+
+BASELINE_FILE = "benchmark_baseline.json"
+TOLERANCE = 0.15  # Allowed throughput drop before a benchmark counts as a regression
+
+PLAYER_COUNTS = [2, 3, 4, 5, 6, 7, 8]
+BOARD_SIZES = [(1, 36), (1, 100), (1, 300), (1, 1000)]
+QUICK_PLAYER_COUNTS = [2, 4, 8]
+QUICK_BOARD_SIZES = [(1, 36), (1, 1000)]
+
+CUBES = 5
+REMOVE = 3
+
+
+def measure(run, min_time, repeat):
+    """Call run() until min_time has passed, `repeat` times.
+    run returns the number of units it did, the best units/sec is returned.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        units = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            units += run()
+            elapsed = time.perf_counter() - start
+        best = max(best, units / elapsed)
+    return best
+
+
+def bench_play(strategy_cls, n_players, lowest, highest, min_time, repeat):
+    seed = [0]
+
+    def new_game():
+        players = [Player.Player(GENERIC_NAMES[i % len(GENERIC_NAMES)], strategy_cls()) for i in range(n_players)]
+        seed[0] += 1
+        return Game(players, CUBES, lowest, highest, REMOVE, rng=spawn_rng("benchmark", seed[0]))
+
+    turns = [0]
+
+    def play_one():
+        game = new_game()
+        game.play()
+        turns[0] += game.turn_counter
+        return 1
+
+    games_per_sec = measure(play_one, min_time, repeat)
+    # Every game is timed, so turns/games of the whole run gives decisions per game
+    decisions_per_game = turns[0] / seed[0]
+    return {
+        "games_per_sec": games_per_sec,
+        "decisions_per_sec": games_per_sec * decisions_per_game,
+    }
+
+
+def bench_player(n_numbers, highest, min_time, repeat):
+    rng = spawn_rng("benchmark", "player", n_numbers)
+    player = Player.Player("ALICE", None)
+    for n in rng.sample(range(1, highest), n_numbers):
+        player.take_number(n)
+
+    def score():
+        for _ in range(100):
+            player.score
+        return 100
+
+    def ladders():
+        for _ in range(10):
+            player.ladders
+        return 10
+
+    return {
+        "score_per_sec": measure(score, min_time, repeat),
+        "ladders_per_sec": measure(ladders, min_time, repeat),
+    }
+
+
+def bench_board(n_players, lowest, highest, min_time, repeat):
+    players = [Player.Player(GENERIC_NAMES[i % len(GENERIC_NAMES)], ALL_STRATEGIES[1]()) for i in range(n_players)]
+    game = Game(players, CUBES, lowest, highest, REMOVE, rng=spawn_rng("benchmark", "board"))
+    # Render the middle of a game
+    for _ in range(game.rounds_left // 2):
+        game.step()
+    game.start_round()
+
+    def render():
+        game.get_board()
+        game.get_scoreboard()
+        return 1
+
+    return {"renders_per_sec": measure(render, min_time, repeat)}
+
+
+def run_benchmarks(quick=False, min_time=0.2, repeat=3, verbose=True):
+    player_counts = QUICK_PLAYER_COUNTS if quick else PLAYER_COUNTS
+    board_sizes = QUICK_BOARD_SIZES if quick else BOARD_SIZES
+    results = {}
+
+    def record(name, metrics):
+        results[name] = metrics
+        if verbose:
+            text = " | ".join(f"{k}: {v:,.0f}" for k, v in metrics.items())
+            print(f"{name:55} {text}")
+
+    for strategy_cls in ALL_STRATEGIES:
+        for n_players in player_counts:
+            for lowest, highest in board_sizes:
+                record(f"play/{strategy_cls.__name__}/{n_players}p/{lowest}-{highest}",
+                       bench_play(strategy_cls, n_players, lowest, highest, min_time, repeat))
+
+    for lowest, highest in board_sizes:
+        n_numbers = (highest - lowest) // 4
+        record(f"player/{n_numbers}-numbers", bench_player(n_numbers, highest, min_time, repeat))
+        for n_players in player_counts:
+            record(f"board/{n_players}p/{lowest}-{highest}",
+                   bench_board(n_players, lowest, highest, min_time, repeat))
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """List of (benchmark, metric, baseline value, current value) that dropped more than tolerance"""
+    regressions = []
+    for name, metrics in baseline.items():
+        if name not in results:
+            continue
+        for metric, old in metrics.items():
+            new = results[name].get(metric)
+            if new is not None and new < old * (1 - tolerance):
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulation benchmarks with regression tracking")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help=f"Baseline JSON file (default = {BASELINE_FILE}).")
+    parser.add_argument("--update", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help=f"Allowed throughput drop (default = {TOLERANCE}).")
+    parser.add_argument("--quick", action="store_true", help="Fewer player counts and board sizes.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per measurement (default = 0.2).")
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements per benchmark, the best is kept (default = 3).")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmarks(args.quick, args.min_time, args.repeat)
+
+    if args.update or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n=== {len(regressions)} regressions (more than {args.tolerance:.0%} slower) ===")
+        for name, metric, old, new in regressions:
+            print(f"{name:55} {metric}: {old:,.0f} -> {new:,.0f} ({new / old - 1:+.0%})")
+        sys.exit(1)
+    print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+from Player import *
+from Server import HOST, PORT, GAME_CONFIG
+
+
+class TableView:
+    """What a client knows about its table, rebuilt from the server's messages"""
+
+    def __init__(self, seat: int, cubes: int, names):
+        self.seat = seat
+        self.players = [Player(name, None, cubes=cubes) for name in names]
+        self.num = None
+        self.pile = 0
+
+    def apply(self, fields) -> str:
+        """Update from one message, returns a line to show (or "")"""
+        command = fields[0]
+        if command == "ROUND":
+            self.num, self.pile = int(fields[2]), 0
+            return f"\nRound {fields[1]}: number [{self.num}] ({fields[3]} left)"
+        if command == "PAY":
+            player = self.players[int(fields[1])]
+            player.cubes -= 1
+            self.pile = int(fields[2])
+            return f"{player.get_name('ljust', 14)}  ■  -->    Pile( {format_pile(self.pile)} )"
+        if command == "TAKE":
+            player = self.players[int(fields[1])]
+            player.take_number(int(fields[2]))
+            player.cubes += int(fields[3])
+            return f"{player.get_name('ljust', 14)} <-- [{fields[2]}] & Pile( {format_pile(int(fields[3]))} )"
+        if command == "END":
+            lines = ["\nGAME FINISHED"]
+            ranked = sorted(zip(map(int, fields[1:]), range(len(self.players))), reverse=True)
+            for rank, (score, seat) in enumerate(ranked, 1):
+                player = self.players[seat]
+                lines.append(f"{rank}. {player.get_name('ljust', 14)} {score:5} {player.get_numbers_formatted_as_ladders()}")
+            return "\n".join(lines)
+        return ""
+
+
+async def read_line(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("server closed the connection")
+    return line.decode().split()
+
+
+async def play(host: str, port: int, name: str, humans: int, bots: int):
+    """Thin terminal client: prints the table and asks for p/t when it is our turn"""
+    reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+    writer.write(f"JOIN {name} {humans} {bots}\n".encode())
+    view = None
+    while True:
+        fields = await read_line(reader)
+        command = fields[0]
+        if command == "WAIT":
+            print(f"Table {fields[1]}: {fields[3]} humans joined")
+        elif command == "START":
+            view = TableView(int(fields[2]), int(fields[3]), fields[6:])
+            print(f"Game started, you are seat {view.seat}: " + ", ".join(p.name for p in view.players))
+        elif command == "YOUR_TURN":
+            prompt = f"Your turn: [{fields[1]}] pile {format_pile(int(fields[2]))}, cubes {fields[3]}. 'p' to pay, 't' to take: "
+            choice = ""
+            while choice not in ("p", "t"):
+                print(prompt, end="", flush=True)
+                choice = (await loop.run_in_executor(None, sys.stdin.readline)).strip() or "t"
+            writer.write(f"{choice}\n".encode())
+            await writer.drain()
+        elif command == "TIMEOUT":
+            print("Too slow, a bot decided for you")
+        elif command == "ERROR":
+            print("Server:", " ".join(fields[1:]))
+            if view is None:
+                break
+        elif view is not None:
+            text = view.apply(fields)
+            if text:
+                print(text)
+            if command == "END":
+                break
+    writer.write(b"QUIT\n")
+    await writer.drain()
+    writer.close()
+
+
+async def auto_player(host: str, port: int, index: int, bots: int, latencies: list, rng: random.Random):
+    """Load test client: joins its own table and answers immediately. Latency is the
+    time from sending a decision until the server broadcasts it back.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"JOIN load{index} 1 {bots}\n".encode())
+    seat = None
+    sent = None
+    while True:
+        fields = await read_line(reader)
+        command = fields[0]
+        if command == "START":
+            seat = fields[2]
+        elif command == "YOUR_TURN":
+            choice = "p" if int(fields[3]) > 0 and rng.random() < 0.6 else "t"
+            sent = time.perf_counter()
+            writer.write(f"{choice}\n".encode())
+            await writer.drain()
+        elif command in ("PAY", "TAKE") and fields[1] == seat and sent is not None:
+            latencies.append(time.perf_counter() - sent)
+            sent = None
+        elif command == "END":
+            break
+        elif command == "ERROR":
+            raise RuntimeError(" ".join(fields[1:]))
+    writer.write(b"QUIT\n")
+    await writer.drain()
+    writer.close()
+
+
+async def load_test(host: str, port: int, tables: int, bots: int, seed: int = 0):
+    latencies = []
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(auto_player(host, port, i, bots, latencies, random.Random(rng.getrandbits(64)))
+                           for i in range(tables)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    rounds = GAME_CONFIG["max"] - GAME_CONFIG["min"] - GAME_CONFIG["remove"]
+    print(f"{tables} simultaneous tables ({bots} bots each), {tables * rounds} rounds in {elapsed:.2f}s")
+    print(f"Human decisions: {len(latencies)} ({len(latencies) / elapsed:.0f}/s)")
+    print(f"Latency ms | p50: {percentile(0.5):.2f} | p95: {percentile(0.95):.2f} "
+          f"| p99: {percentile(0.99):.2f} | max: {latencies[-1] * 1000:.2f}")
+
+
+async def spawn_server(port: int):
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Server.py"), "--port", str(port), stdout=asyncio.subprocess.PIPE)
+    while b"Serving" not in await process.stdout.readline():
+        pass
+    return process
+
+
+async def run_load_test(args):
+    server = await spawn_server(args.port) if args.spawn_server else None
+    try:
+        await load_test(args.host, args.port, args.load_test, args.bots)
+    finally:
+        if server is not None:
+            server.terminate()
+            await server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play on a Numbers & Ladders server (see Server.py)")
+    parser.add_argument("--host", default=HOST, help=f"Server address (default = {HOST}).")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Server port (default = {PORT}).")
+    parser.add_argument("--name", default="Player", help="Your name at the table.")
+    parser.add_argument("--humans", type=int, default=1, help="Humans at the table, it starts when all joined (default = 1).")
+    parser.add_argument("--bots", type=int, default=3, help="Bots at the table (default = 3).")
+    parser.add_argument("--load-test", type=int, default=None, metavar="TABLES",
+                        help="Instead of playing, run TABLES simultaneous tables with an automatic player each.")
+    parser.add_argument("--spawn-server", action="store_true", help="Start Server.py for the load test.")
+    args = parser.parse_args()
+
+    if args.load_test:
+        asyncio.run(run_load_test(args))
+    else:
+        asyncio.run(play(args.host, args.port, args.name.replace(" ", "_"), args.humans, args.bots))
@@ -0,0 +1,189 @@
+import json
+import os
+import struct
+
+from Observers import Observer
+
+# File layout: HEADER, then fixed-width little-endian records (RECORD) back to back.
+# Next to the decision log, <path>.games holds one RESULT per player per game in the
+# same layout and <path>.strategies.json the strategy names (index = strategy id).
+MAGIC = b"NLDLOG\x00\x01"
+RESULTS_MAGIC = b"NLGAME\x00\x01"
+HEADER = struct.Struct("<8sII")  # magic, record size, reserved
+RECORD = struct.Struct("<IHHBHHB")  # game, round, number, seat, pile, cubes, choice
+RESULT = struct.Struct("<IBHiHB")  # game, seat, strategy, score, cubes, rank
+
+PAY = 0
+TAKE = 1
+FORCED = 2  # Took because the player had no cubes left
+
+DECISION_DTYPE = [
+    ("game", "<u4"),
+    ("round", "<u2"),
+    ("number", "<u2"),
+    ("seat", "u1"),
+    ("pile", "<u2"),
+    ("cubes", "<u2"),
+    ("choice", "u1"),
+]
+
+RESULT_DTYPE = [
+    ("game", "<u4"),
+    ("seat", "u1"),
+    ("strategy", "<u2"),
+    ("score", "<i4"),
+    ("cubes", "<u2"),
+    ("rank", "u1"),  # 0 = winner, ties are broken by seat like StrategyEvaluator
+]
+
+FLUSH_BYTES = 1 << 20
+
+
+class DecisionRecorder(Observer):
+    """Streams every decision to an append-only binary file (see DECISION_DTYPE).
+    Records are packed into a bytearray and written in bulk once it holds
+    FLUSH_BYTES. pile and cubes are the values before the decision.
+
+    Game ids count up from 0 (or from the last game already in the file), one per
+    game that reaches on_game_end, which also writes the final scores to
+    <path>.games. Use as a context manager or call close().
+    """
+
+    def __init__(self, path: str, flush_bytes: int = FLUSH_BYTES):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.buffer = bytearray()
+        self.result_buffer = bytearray()
+        self.records = 0
+        self.strategy_ids = {name: i for i, name in enumerate(read_strategy_names(path))}
+        self.file, last = open_log(path, MAGIC, RECORD)
+        self.results_file, last_result = open_log(results_path(path), RESULTS_MAGIC, RESULT)
+        self.game_id = max(last[0] + 1 if last else 0, last_result[0] + 1 if last_result else 0)
+
+    def record(self, game, player, choice: int):
+        self.buffer += RECORD.pack(self.game_id, game.round_counter, game.num,
+                                   game.players.index(player), game.pile, player.cubes, choice)
+        self.records += 1
+
+    def on_decision(self, game, player, choice, seconds):
+        self.record(game, player, PAY if choice == "p" else TAKE)
+
+    def on_take(self, game, player, forced):
+        if forced:
+            self.record(game, player, FORCED)
+
+    def on_game_end(self, game):
+        ranked = sorted(game.players, key=lambda p: p.score, reverse=True)
+        for seat, player in enumerate(game.players):
+            strategy = self.strategy_ids.setdefault(player.strategy.name, len(self.strategy_ids))
+            self.result_buffer += RESULT.pack(self.game_id, seat, strategy, player.score,
+                                              player.cubes, ranked.index(player))
+        self.game_id += 1
+        if len(self.buffer) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+        self.results_file.write(self.result_buffer)
+        self.results_file.flush()
+        self.result_buffer.clear()
+        with open(strategies_path(self.path), "w") as f:
+            json.dump(list(self.strategy_ids), f)
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+            self.results_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def report(self):
+        return [f"=== Decision log: {self.records} decisions from {self.game_id} games in {self.path} ==="]
+
+
+def results_path(path: str) -> str:
+    return path + ".games"
+
+
+def strategies_path(path: str) -> str:
+    return path + ".strategies.json"
+
+
+def read_header(path: str, magic: bytes = MAGIC, record: struct.Struct = RECORD):
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size or HEADER.unpack(data)[0] != magic:
+        raise ValueError(f"{path} is not a {magic[:6].decode()} file")
+    record_size = HEADER.unpack(data)[1]
+    if record_size != record.size:
+        raise ValueError(f"{path} has {record_size} byte records, expected {record.size}")
+
+
+def open_log(path: str, magic: bytes, record: struct.Struct):
+    """Open path for appending records, writing the header if it is new.
+    Returns the file and the last record already in it (None if empty).
+    """
+    last = None
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        read_header(path, magic, record)
+        size = os.path.getsize(path) - HEADER.size
+        if size % record.size:
+            raise ValueError(f"{path} ends with a partial record")
+        if size:
+            with open(path, "rb") as f:
+                f.seek(-record.size, os.SEEK_END)
+                last = record.unpack(f.read(record.size))
+        return open(path, "ab"), last
+    f = open(path, "wb")
+    f.write(HEADER.pack(magic, record.size, 0))
+    return f, last
+
+
+def memmap_records(path: str, magic: bytes, record: struct.Struct, dtype_fields):
+    import numpy as np
+
+    read_header(path, magic, record)
+    dtype = np.dtype(dtype_fields)
+    count = (os.path.getsize(path) - HEADER.size) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER.size, shape=(count,))
+
+
+def read_decisions(path: str):
+    """The decisions in path as a read-only NumPy structured array (see DECISION_DTYPE).
+    The file is memory-mapped, nothing is loaded until the fields are used.
+    """
+    return memmap_records(path, MAGIC, RECORD, DECISION_DTYPE)
+
+
+def read_results(path: str):
+    """Final scores of the games in the decision log at path (see RESULT_DTYPE), memory-mapped"""
+    return memmap_records(results_path(path), RESULTS_MAGIC, RESULT, RESULT_DTYPE)
+
+
+def read_strategy_names(path: str) -> list:
+    """Strategy names of the decision log at path, index = strategy id in the results"""
+    if not os.path.exists(strategies_path(path)):
+        return []
+    with open(strategies_path(path), "r") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    import sys
+    import numpy as np
+
+    decisions = read_decisions(sys.argv[1])
+    games = int(decisions["game"].max()) + 1 if len(decisions) else 0
+    print(f"{len(decisions)} decisions from {games} games")
+    counts = np.bincount(decisions["choice"], minlength=3)
+    for choice, name in [(PAY, "pay"), (TAKE, "take"), (FORCED, "forced take")]:
+        print(f"{name:12} {counts[choice]:12} ({counts[choice] / max(len(decisions), 1):.1%})")
@@ -1,4 +1,6 @@
 from Player import *
+import copy
+import time
 
 class Game:
 
@@ -8,8 +10,16 @@ class Game:
             n_starting_cubes_per_player: int,
             lowest_number: int,
             highest_number: int,
-            n_numbers_to_remove:int = 0
+            n_numbers_to_remove:int = 0,
+            rng: random.Random = None,
+            observers: list = None
         ):
+            if lowest_number < 0:
+                # Players keep their numbers as a bitmask (bit n = owns n)
+                raise ValueError(f"lowest_number can't be negative, got {lowest_number}")
+            # All randomness of the game (deck and strategies) comes from game.rng.
+            # Without an rng the stream is seeded from the global random module.
+            game.rng = rng if rng is not None else random.Random(random.getrandbits(64))
             game.players = players
             game.set_starting_cubes(n_starting_cubes_per_player)
             game.lowest_number = lowest_number
@@ -17,17 +27,87 @@ class Game:
             game.n_numbers_to_remove = n_numbers_to_remove
 
             game.numbers = {k:v for k,v in zip(range(lowest_number,highest_number), [None])}
-            game.number_stack = list(range(lowest_number, highest_number))
-            random.shuffle(game.number_stack)
+            # The deck is never mutated: rounds read deck[cursor] and advance the cursor,
+            # so clones can share it
+            game.deck = list(range(lowest_number, highest_number))
+            game.rng.shuffle(game.deck)
 
             for _ in range(n_numbers_to_remove):
-                game.number_stack.pop()
+                game.deck.pop()
+            game.cursor = 0
 
+            game.num = None
+            game.pile = 0
             game.round_counter = 0 
             game.turn_counter = 0
             game.turn_record = []
             game.latest_synced_turn = -1
 
+            game.observers = []
+            for observer in observers or []:
+                game.add_observer(observer)
+
+    def add_observer(game, observer):
+        """Attach an observer (see Observers.Observer). Games without observers
+        keep the plain step(), so hooks cost nothing unless they are used.
+        """
+        game.observers.append(observer)
+        game.step = game.step_observed
+        game.finish_round = game.finish_round_observed
+
+    def notify(game, event: str, *args):
+        for observer in game.observers:
+            getattr(observer, event)(game, *args)
+
+    @property
+    def number_stack(game) -> Tuple[int, ...]:
+        """Numbers left to play, in draw order. A tuple, so code that still pops
+        from it fails instead of silently changing a copy (assign to change it)."""
+        return tuple(game.deck[game.cursor:])
+
+    @number_stack.setter
+    def number_stack(game, numbers):
+        game.deck = list(numbers)
+        game.cursor = 0
+
+    @property
+    def rounds_left(game) -> int:
+        return len(game.deck) - game.cursor
+
+    def snapshot(game) -> tuple:
+        """Compact copy of everything that changes during play.
+        The deck itself is not included since it never changes.
+        """
+        return (
+            game.cursor,
+            game.num,
+            game.pile,
+            game.round_counter,
+            game.turn_counter,
+            tuple(player.get_state() for player in game.players),
+        )
+
+    def restore(game, state: tuple):
+        """Go back to a state from snapshot()"""
+        game.cursor, game.num, game.pile, game.round_counter, game.turn_counter, player_states = state
+        for player, player_state in zip(game.players, player_states):
+            player.set_state(player_state)
+
+    def clone(game) -> "Game":
+        """Copy of the game that can be played forward without changing this one.
+        Players are copied (strategies are shared), the deck and rng are shared and
+        the terminal history and observers are left out. Assign clone.rng for an
+        independent stream.
+        """
+        new = copy.copy(game)
+        new.players = [player.copy() for player in game.players]
+        new.turn_record = []
+        # Clones are used for search, they never carry observers
+        new.observers = []
+        new.__dict__.pop("step", None)
+        new.__dict__.pop("finish_round", None)
+        return new
+
 
     def set_starting_cubes(game, n: int):
         for player in game.players:
@@ -41,6 +121,10 @@ class Game:
     def get_board(game, indentation = 12):
         line = ""+" "*indentation
         lines = []
+        owners = {}
+        for player in game.players:
+            for n in player.numbers:
+                owners.setdefault(n, player)
         for n in range(game.lowest_number, game.highest_number ):
             if n == game.num:
                 line += color_text('white',f'({str(n).rjust(2)})')
@@ -48,10 +132,9 @@ class Game:
                     lines.append(line)
                     line = ""+" "*indentation
             else:
-                for player in game.players:
-                    if n in player.numbers:
-                        formatted_number = player.format_number(n)
-                        break
+                player = owners.get(n)
+                if player is not None:
+                    formatted_number = player.format_number(n)
                 else:
                     formatted_number = color_text('black',f'[{str(n).rjust(2)}]')
                 line += formatted_number
@@ -77,6 +160,11 @@ class Game:
             print(line)
         
     def print_history(game):
+        history = game.get_history()
+        if history:
+            print("\n".join(history))
+
+    def get_history(game) -> List[str]:
         history=[]
         round = None
         round_counter=0
@@ -93,9 +181,12 @@ class Game:
                 continue
             turn = round[turn_counter]
             history.insert(0,turn)
-        for line in history: print(line)
+        return history
     
     def draw_board_and_score(game):
+        print("\n".join(game.get_board_and_score()))
+
+    def get_board_and_score(game) -> List[str]:
         scoreboard_lines =game.get_scoreboard()
         scoreboard_dims = get_dims(scoreboard_lines)
         board_lines = game.get_board(0)
@@ -107,34 +198,40 @@ class Game:
             l1 = l1.ljust(scoreboard_dims[0])
             l2 = l2.ljust(board_dims[0])
             lines.append(l2+"  |+|  "+l1)
-        for line in lines:
-            print(line)
+        return lines
 
     def step_in_terminal(game, redo = False):
-        """Run one round with user input/output in the terminal
+        """Run one round with user input/output in the terminal.
+        The screen is redrawn (in one write) before a human decides, in a loop instead
+        of calling itself again.
         """
         if not redo:
-            num = game.number_stack.pop(0)
-            game.num = num
-            game.round_counter+=1
+            game.start_round()
+            game.notify("on_round_start")
+            num = game.num
             game.auto_select_counter=0
             print()
             input(f"Press enter to begin round {game.round_counter}")
         else:
             num = game.num
-        clear()
-        game.draw_board_and_score()
+        while game.draw_round(num, redo):
+            redo = True
 
-        print()
-        print("| ROUND | NUMBER | TURN |    PLAYER    |  CUBES |    ACTION ")
-        game.print_history()
+    def draw_round(game, num, redo) -> bool:
+        """Draw the screen and play turns until the round ends (False) or the screen
+        has to be redrawn for a human player (True)
+        """
+        frame = [CLEAR_SCREEN + "\n".join(game.get_board_and_score()), "",
+                 "| ROUND | NUMBER | TURN |    PLAYER    |  CUBES |    ACTION "]
+        frame += game.get_history()
         if redo:
-            for line in game.turn_lines:
-                print(line)
+            frame += game.turn_lines
         else:
             game.turn_lines = []
             game.pile = 0
             game.local_counter = 0
+        sys.stdout.write("\n".join(frame) + "\n")
+        sys.stdout.flush()
         while True:
             #if not redo:
             turn_statement = f'|{str(game.round_counter).center(7)}|' if game.local_counter == 0 else "|       |"
@@ -155,20 +252,18 @@ class Game:
  
                 game.turn_lines.append(turn_statement)
                 print(game.turn_lines[-1])
-                player.numbers.append(num)
-                player.cubes += game.pile
-                game.pile = 0
+                game.notify("on_take", player, True)
+                game.take(player)
                 game.turn_record.append(game.turn_lines)
                 game.turn_counter +=1
                 game.num = None
-                break
+                return False
 
             if player.played_by_human and game.auto_select_counter<5:
                 #Always update to latest before showing human
                 if game.latest_synced_turn != game.turn_counter:
                     game.latest_synced_turn = game.turn_counter
-                    game.step_in_terminal(redo = True)
-                    return
+                    return True
                 choice = None
                 phrase = None
                 print(turn_statement+' (WATING FOR PLAYER INPUT)')
@@ -178,24 +273,25 @@ class Game:
                 phrase += f" 'p' - to pay and throw one cube in the pile\n"
                 if game.pile>=1: phrase += f" 't' - to take number [{str(num).rjust(2)}] and {format_pile(game.pile)} from the pile\n"
                 else: phrase += f" 't' - to take number [{str(num).rjust(2)}]\n"
+                start = time.perf_counter()
                 choice = input(phrase)
                 if choice == "l": choice = "t"
                 if choice in ["t", "p"]:
                     clear_previous_line(6)
                 else: 
                     game.auto_select_counter+=1
-                    game.step_in_terminal(redo = True)
-                    return
+                    return True
             else: # Simulated decision: 50% chance to pay or take
+                start = time.perf_counter()
                 choice = player.strategy.make_choice(game,player)
+            game.notify("on_decision", player, choice, time.perf_counter() - start)
 
             # A Valid choice as been made
             game.turn_counter+=1
 
             statement = ''
             if choice == "p":
-                player.cubes -= 1
-                game.pile += 1
+                game.pay(player)
                 statement += f"  ■  -->    Pile( {format_pile(game.pile)} )"
             else:
                 if game.pile>0:
@@ -203,9 +299,8 @@ class Game:
                     statement += color_text(player.color,f' <-- [{str(num).rjust(2)}] & Pile( {format_pile(game.pile)} )')
                 else:
                     statement += color_text(player.color,f' <-- [{str(num).rjust(2)}]')
-                player.numbers.append(num)
-                player.cubes += game.pile
-                game.pile = 0
+                game.notify("on_take", player, False)
+                game.take(player)
                 end_turn = True
 
             turn_statement += statement
@@ -217,57 +312,83 @@ class Game:
                 game.turn_record.append(game.turn_lines)
                 game.turn_counter+=1
                 game.num = None
-                break
+                return False
 
-    def step(game):
-        """
-        Simulate one round of the game
-        """
-        num = game.number_stack.pop(0)
-        game.num = num
+    def start_round(game):
+        """Draw the next number and start a round with an empty pile"""
+        game.num = game.deck[game.cursor]
+        game.cursor += 1
         game.round_counter += 1
+        game.pile = 0
+
+    def next_player(game) -> Player:
+        game.turn_counter += 1
+        return game.players[game.turn_counter % len(game.players)]
 
+    def pay(game, player: Player):
+        player.cubes -= 1
+        game.pile += 1
+
+    def take(game, player: Player):
+        """Give the current number and the pile to player. This ends the round."""
+        player.take_number(game.num)
+        player.cubes += game.pile
         game.pile = 0
-        local_counter = 0
+        game.num = None
 
-        while True:
-            local_counter += 1
-            game.turn_counter += 1
-            end_turn = False
-            player: Player = game.players[game.turn_counter % len(game.players)]
+    def step(game):
+        """
+        Simulate one round of the game
+        """
+        game.start_round()
+        game.finish_round()
 
-            if player.cubes == 0:
-                player.numbers.append(num)
-                player.cubes += game.pile
-                game.pile = 0
-                game.num = None
-                break
+    def finish_round(game):
+        """
+        Simulate turns until someone takes the current number.
+        Also continues a round from the middle, e.g. after restore().
+        """
+        while game.num is not None:
+            player: Player = game.next_player()
 
             # Simulate choice even for human players
-            if player.played_by_human:
-                choice = player.strategy.make_choice(game, player)
+            if player.cubes == 0 or player.strategy.make_choice(game, player) != "p":
+                game.take(player)
             else:
-                choice = player.strategy.make_choice(game, player)
+                game.pay(player)
 
-            if choice == "p":
-                player.cubes -= 1
-                game.pile += 1
-            else:
-                player.numbers.append(num)
-                player.cubes += game.pile
-                game.pile = 0
-                end_turn = True
+    def step_observed(game):
+        """step() with observer hooks, used once an observer is attached"""
+        game.start_round()
+        for observer in game.observers:
+            observer.on_round_start(game)
+        game.finish_round_observed()
 
+    def finish_round_observed(game):
+        observers = game.observers
+        while game.num is not None:
+            player: Player = game.next_player()
+            if player.cubes == 0:
+                for observer in observers:
+                    observer.on_take(game, player, True)
+                game.take(player)
+                continue
 
-            if end_turn:
-                game.num = None
-                break
-        
-    
+            start = time.perf_counter()
+            choice = player.strategy.make_choice(game, player)
+            elapsed = time.perf_counter() - start
+            for observer in observers:
+                observer.on_decision(game, player, choice, elapsed)
+            if choice != "p":
+                for observer in observers:
+                    observer.on_take(game, player, False)
+                game.take(player)
+            else:
+                game.pay(player)
 
     def play(game, in_terminal = False):
         if in_terminal:
-            while game.number_stack:
+            while game.rounds_left:
                 game.step_in_terminal()
 
             clear()
@@ -276,6 +397,8 @@ class Game:
             print("")
             game.draw_board_and_score()
         else:
-            while game.number_stack:
+            while game.rounds_left:
                 game.step()
+        for observer in game.observers:
+            observer.on_game_end(game)
 
@@ -0,0 +1,187 @@
+import argparse
+import os
+import queue
+
+from Training import *
+
+MIGRATION_INTERVAL = 5  # Generations between migrations
+MIGRANTS = 2  # Best individuals an island sends per migration
+TOPOLOGIES = ("ring", "full", "random")
+RESULT_TIMEOUT = 1.0  # Seconds between checks that the workers are still alive
+
+
+def migration_edges(topology, n_islands, seed, gen):
+	"""(source, destination) islands of the migration after generation gen.
+	"random" sends every island to one other island, drawn again for each migration
+	from spawn_rng(seed, "migration", gen) so all workers agree on the edges.
+	"""
+	if n_islands < 2:
+		return []
+	if topology == "ring":
+		return [(i, (i + 1) % n_islands) for i in range(n_islands)]
+	if topology == "full":
+		return [(i, j) for i in range(n_islands) for j in range(n_islands) if i != j]
+	if topology == "random":
+		rng = spawn_rng(seed, "migration", gen)
+		return [(i, (i + rng.randrange(1, n_islands)) % n_islands) for i in range(n_islands)]
+	raise ValueError(f"Unknown topology {topology}, use one of {', '.join(TOPOLOGIES)}")
+
+def receive_migrants(inbox, gen, expected, pending):
+	"""Wait for the expected migrant messages of generation gen.
+	Messages of later migrations (from islands that are ahead) are kept in pending.
+	Returns {destination island: [(source island, migrants)]}.
+	"""
+	received = pending.pop(gen, [])
+	while len(received) < expected:
+		msg_gen, src, dst, migrants = inbox.get()
+		if msg_gen == gen:
+			received.append((src, dst, migrants))
+		else:
+			pending.setdefault(msg_gen, []).append((src, dst, migrants))
+	incoming = {}
+	for src, dst, migrants in received:
+		incoming.setdefault(dst, []).append((src, migrants))
+	return incoming
+
+def accept_migrants(population, incoming, migrants):
+	"""Replace the worst individuals of a sorted population by the best incoming migrants"""
+	# Sources in a fixed order, so the result does not depend on arrival order
+	candidates = [ind for _, sent in sorted(incoming, key=lambda item: item[0]) for ind in sent]
+	candidates.sort(key=lambda ind: ind["score"], reverse=True)
+	accepted = candidates[:min(migrants, len(population) // 2)]
+	if accepted:
+		population[-len(accepted):] = [dict(ind) for ind in accepted]
+		population.sort(key=lambda ind: ind["score"], reverse=True)
+
+def evolve_islands(worker, setup, inboxes, results):
+	"""Evolve the islands i with i % workers == worker.
+	Island i draws from spawn_rng(seed, "island", i) and plays game j of generation gen
+	with spawn_rng(seed, "island", i, gen, j), so the run does not depend on the
+	number of workers. Migrants travel as (gen, source, destination, migrants) over
+	the inbox of the destination's worker.
+	"""
+	strategy_cls, param_template, n_islands, island_size, generations, interval, migrants, topology, seed = setup
+	workers = len(inboxes)
+	inbox = inboxes[worker]
+	islands = {}
+	for i in range(worker, n_islands, workers):
+		rng = spawn_rng(seed, "island", i)
+		population = [random_individual(strategy_cls, param_template, rng) for _ in range(island_size)]
+		islands[i] = (population, rng, FitnessCache())
+	pending = {}
+
+	for gen in range(generations):
+		for i, (population, rng, cache) in islands.items():
+			evaluate_population(population, GA_GAME_CONFIG, rng, (seed, "island", i, gen), cache=cache)
+			population.sort(key=lambda ind: ind["score"], reverse=True)
+			results.put(("best", gen, i, population[0]["score"], population[0]["params"]))
+
+		if interval and (gen + 1) % interval == 0 and gen + 1 < generations:
+			edges = migration_edges(topology, n_islands, seed, gen)
+			for src, dst in edges:
+				if src in islands:
+					inboxes[dst % workers].put((gen, src, dst, islands[src][0][:migrants]))
+			expected = sum(1 for _, dst in edges if dst in islands)
+			incoming = receive_migrants(inbox, gen, expected, pending)
+			for dst, sent in incoming.items():
+				accept_migrants(islands[dst][0], sent, migrants)
+
+		for i, (population, rng, cache) in islands.items():
+			top_half = population[:island_size // 2]
+			islands[i] = (reproduce(top_half, strategy_cls, param_template, island_size, rng), rng, cache)
+	results.put(("done", worker, None, None, None))
+
+def collect_results(results, n_islands, generations, workers, processes=()):
+	"""Read the per-generation bests of all islands and print each finished generation.
+	Returns the best (score, params) per generation and the best scores of every island.
+	"""
+	island_history = {i: [None] * generations for i in range(n_islands)}
+	best = [None] * generations
+	reported = [0] * generations
+	done = 0
+	while done < workers:
+		try:
+			kind, gen, island, score, params = results.get(timeout=RESULT_TIMEOUT)
+		except queue.Empty:
+			failed = [p for p in processes if p.exitcode not in (None, 0)]
+			if failed:
+				raise RuntimeError(f"Island worker {failed[0].name} stopped with exit code {failed[0].exitcode}")
+			continue
+		if kind == "done":
+			done += 1
+			continue
+		island_history[island][gen] = score
+		if best[gen] is None or (score, -island) > (best[gen][0], -best[gen][2]):
+			best[gen] = (score, params, island)
+		reported[gen] += 1
+		if reported[gen] == n_islands:
+			score, params, island = best[gen]
+			print(f"Generation {gen+1}: Best Score = {score:.2f} (island {island}) Params = {params}")
+	return best, island_history
+
+def run_islands(strategy_cls, param_template, n_islands=8, island_size=10, generations=50,
+		migration_interval=MIGRATION_INTERVAL, migrants=MIGRANTS, topology="ring", workers=None, seed=0):
+	"""Island-model genetic algorithm: n_islands populations evolve apart (like
+	genetic_algorithm) and every migration_interval generations each island sends
+	its best `migrants` along the edges of the topology, where they replace the
+	worst individuals. Islands are spread over `workers` processes, workers <= 1
+	runs them all in this process. Results are the same for any number of workers.
+	Returns the best individual of the last generation, the best score per
+	generation and the best scores per island.
+	"""
+	if topology not in TOPOLOGIES:
+		raise ValueError(f"Unknown topology {topology}, use one of {', '.join(TOPOLOGIES)}")
+	if island_size < 4:
+		raise ValueError("An island needs at least 4 individuals (3 opponents per game)")
+	workers = max(1, min(workers or 1, n_islands))
+	setup = (strategy_cls, param_template, n_islands, island_size, generations, migration_interval,
+		migrants, topology, seed)
+
+	if workers == 1:
+		results = queue.SimpleQueue()
+		evolve_islands(0, setup, [queue.SimpleQueue()], results)
+		best, island_history = collect_results(results, n_islands, generations, 1)
+	else:
+		import multiprocessing  # Only paid for when workers are used
+		inboxes = [multiprocessing.Queue() for _ in range(workers)]
+		results = multiprocessing.Queue()
+		processes = [multiprocessing.Process(target=evolve_islands, args=(w, setup, inboxes, results),
+			name=f"island-worker-{w}", daemon=True) for w in range(workers)]
+		for process in processes:
+			process.start()
+		try:
+			best, island_history = collect_results(results, n_islands, generations, workers, processes)
+		finally:
+			for process in processes:
+				process.join(timeout=RESULT_TIMEOUT)
+				if process.is_alive():
+					process.terminate()
+
+	score, params, _ = best[-1]
+	individual = {"strategy_cls": strategy_cls, "params": params, "score": score}
+	return individual, [b[0] for b in best], island_history
+
+
+if __name__ == "__main__":
+	from Arena2 import STRATEGY_TRAINING_CONFIGS
+
+	names = [config["name"] for config in STRATEGY_TRAINING_CONFIGS]
+	parser = argparse.ArgumentParser(description="Train strategy params with an island-model genetic algorithm")
+	parser.add_argument("--strategy", choices=names, default=names[0], help=f"Strategy to train (default = {names[0]}).")
+	parser.add_argument("--islands", type=int, default=8, help="Number of islands (default = 8).")
+	parser.add_argument("--island-size", type=int, default=10, help="Individuals per island (default = 10).")
+	parser.add_argument("--generations", type=int, default=50, help="Generations (default = 50).")
+	parser.add_argument("--interval", type=int, default=MIGRATION_INTERVAL, help=f"Generations between migrations, 0 = never (default = {MIGRATION_INTERVAL}).")
+	parser.add_argument("--migrants", type=int, default=MIGRANTS, help=f"Individuals each island sends per migration (default = {MIGRANTS}).")
+	parser.add_argument("--topology", choices=TOPOLOGIES, default="ring", help="Where migrants go (default = ring).")
+	parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default = all cores).")
+	parser.add_argument("--seed", type=int, default=0, help="Root seed (default = 0).")
+	parser.add_argument("--save", action="store_true", help="Save the best params to the param store (params.sqlite).")
+	args = parser.parse_args()
+
+	config = STRATEGY_TRAINING_CONFIGS[names.index(args.strategy)]
+	best, score_history, island_history = run_islands(config["class"], config["param_template"], args.islands,
+		args.island_size, args.generations, args.interval, args.migrants, args.topology, args.workers, args.seed)
+	print("Final best:", best)
+	if args.save:
+		save_best_params(best)
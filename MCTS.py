@@ -0,0 +1,165 @@
+import math
+import random
+import time
+
+from Strategy import *
+
+
+class DecisionNode:
+    """One of our own pay/take decisions within a round.
+    stats[action] = [visits, total reward]. after_pay maps the pile size at our
+    next turn in the same round to the node for that decision.
+    """
+    __slots__ = ("visits", "stats", "after_pay")
+
+    def __init__(self):
+        self.visits = 0
+        self.stats = {"p": [0, 0.0], "t": [0, 0.0]}
+        self.after_pay = {}
+
+    def best_action(self) -> str:
+        return max(self.stats, key=lambda action: self.stats[action][0])
+
+
+class MCTSStrategy(Strategy):
+    """UCT search over the pay/take decision.
+
+    The order of the remaining deck and the numbers removed at the start are hidden,
+    so every rollout deals the unseen numbers at random. Our decisions in the current
+    round are chosen by UCT, everything after that (and all opponent turns) is played
+    by an existing strategy used as rollout policy.
+
+    Params:
+    - rollouts: max rollouts per decision (default 200)
+    - time_limit_ms: max time per decision, used together with or instead of rollouts
+    - exploration: UCT exploration constant (rewards are scaled to [0, 1])
+    - rollout_policy: class name of the strategy used in rollouts
+    """
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.rollouts = params.get("rollouts", 200)
+        self.time_limit_ms = params.get("time_limit_ms", None)
+        if self.rollouts is None and self.time_limit_ms is None:
+            raise ValueError("MCTSStrategy needs rollouts, time_limit_ms or both to bound its search")
+        self.exploration = params.get("exploration", 1.0)
+        policy = params.get("rollout_policy", "GreedyLadderExtensionStrategy")
+        self.rollout_policy = get_strategy_class(policy)(**params.get("rollout_params", {}))
+        self._reuse = None  # (game id, round, seat, node) for tree reuse in the same round
+        self.last_search = {}
+
+    def make_choice(self, game: Game, player: Player):
+        seat = game.players.index(player)
+        root = self.get_root(game, seat)
+
+        sim = game.clone()
+        # Rollouts draw from their own stream so the game's stream only advances by one draw
+        sim.rng = random.Random(game.rng.getrandbits(64))
+        for sim_player in sim.players:
+            sim_player.strategy = self.rollout_policy
+        root_state = sim.snapshot()
+
+        taken = set()
+        for p in game.players:
+            taken.update(p.numbers)
+        unseen = [n for n in range(game.lowest_number, game.highest_number)
+                  if n not in taken and n != game.num]
+        remaining = game.rounds_left
+
+        bounds = [math.inf, -math.inf]
+        rollouts = 0
+        start = time.perf_counter()
+        deadline = None if self.time_limit_ms is None else start + self.time_limit_ms / 1000
+        while True:
+            if self.rollouts is not None and rollouts >= self.rollouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self.rollout(sim, root_state, seat, unseen, remaining, root, bounds)
+            rollouts += 1
+
+        choice = root.best_action()
+        self.last_search = {
+            "rollouts": rollouts,
+            "visits": root.visits,
+            "ms": (time.perf_counter() - start) * 1000,
+        }
+        self._reuse = (id(game), game.round_counter, seat, root) if choice == "p" else None
+        return choice
+
+    def get_root(self, game, seat) -> DecisionNode:
+        """Reuse the subtree from our previous decision if we paid earlier this round"""
+        if self._reuse is not None:
+            game_id, round_counter, reuse_seat, node = self._reuse
+            if game_id == id(game) and round_counter == game.round_counter and reuse_seat == seat:
+                child = node.after_pay.get(game.pile)
+                if child is not None:
+                    return child
+        return DecisionNode()
+
+    def select(self, node: DecisionNode, bounds) -> str:
+        low, high = bounds
+        if high < low:  # No rewards seen yet in this search (reused tree)
+            low, high = 0.0, 0.0
+        scale = high - low if high > low else 1.0
+        log_visits = math.log(node.visits) if node.visits else 0.0
+        best, best_value = None, -math.inf
+        for action, (visits, total) in node.stats.items():
+            if visits == 0:
+                return action
+            value = (total / visits - low) / scale + self.exploration * math.sqrt(log_visits / visits)
+            if value > best_value:
+                best, best_value = action, value
+        return best
+
+    def rollout(self, sim, root_state, seat, unseen, remaining, node, bounds):
+        sim.restore(root_state)
+        sim.rng.shuffle(unseen)
+        sim.deck = unseen[:remaining]
+        sim.cursor = 0
+        me = sim.players[seat]
+        players = sim.players
+
+        # Tree part: our decisions in the current round
+        path = []
+        while True:
+            action = self.select(node, bounds)
+            path.append((node, action))
+            if action == "t":
+                sim.take(me)
+                break
+            sim.pay(me)
+            while True:
+                p = sim.next_player()
+                if p is me:
+                    break
+                if p.cubes == 0 or p.strategy.make_choice(sim, p) != "p":
+                    sim.take(p)
+                    break
+                sim.pay(p)
+            if sim.num is None:
+                break
+            if me.cubes == 0:
+                sim.take(me)
+                break
+            child = node.after_pay.get(sim.pile)
+            if child is None:
+                child = node.after_pay[sim.pile] = DecisionNode()
+            node = child
+
+        # Rollout part: the rest of the game
+        step = sim.step
+        while sim.cursor < len(sim.deck):
+            step()
+
+        score = me.score
+        reward = score - max(p.score for p in players if p is not me)
+        if reward < bounds[0]:
+            bounds[0] = reward
+        if reward > bounds[1]:
+            bounds[1] = reward
+        for visited, action in path:
+            visited.visits += 1
+            stats = visited.stats[action]
+            stats[0] += 1
+            stats[1] += reward
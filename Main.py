@@ -1,6 +1,8 @@
 import argparse
 from Game import * 
 from Strategy import *
+from Training import load_best_params
+from Renderer import spectate
 
 # === Add your custom strategies here ===
 ALL_STRATEGIES = [
@@ -31,30 +33,17 @@ def parse_args():
     parser.add_argument("--min", type=int, default=1, help="Lowest number (default = 1).")
     parser.add_argument("--max", type=int, default=36, help="Highest number (default = 35).")
     parser.add_argument("--remove", type=int, default=3, help="How many numbers to remove from the stack (default = 3).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the deck and the bots, to replay a game.")
     parser.add_argument("-silent", action="store_true", help="Run a silent simulation of the game without terminal output")
-    return parser.parse_args()
-
-import json
-import os
-
-def get_strategy_filename(strategy_cls):
-    return f"best_params_{strategy_cls.__name__}.json"
-
-def save_best_params(individual):
-    filename = get_strategy_filename(individual["strategy_cls"])
-    with open(filename, "w") as f:
-        json.dump(individual["params"], f, indent=2)
-    print(f"Saved best parameters to {filename}")
-
-def load_best_params(strategy_cls):
-    filename = get_strategy_filename(strategy_cls)
-    if not os.path.exists(filename):
-        print(f"No saved parameters found for {strategy_cls.__name__}")
-        return None
-    with open(filename, "r") as f:
-        params = json.load(f)
-    print(f"Loaded saved parameters from {filename}")
-    return params
+    parser.add_argument("--spectate", action="store_true", help="Watch an all-bot game without pressing enter every round")
+    parser.add_argument("--fps", type=float, default=30, help="Max frames per second when spectating (default = 30).")
+    parser.add_argument("--speed", type=float, default=10, help="Rounds per second when spectating (default = 10).")
+    args = parser.parse_args()
+    if args.spectate and args.humans:
+        parser.error("--spectate only works without --humans")
+    if args.min < 0:
+        parser.error("--min can't be negative")
+    return args
 
 if __name__ == "__main__":
     args = parse_args()
@@ -75,5 +64,9 @@ if __name__ == "__main__":
 
         players.append(Player.Player(name=name, played_by_human=is_human, strategy=strategy))
 
-    game = Game.Game(players, args.cubes, args.min, args.max, args.remove)
-    game.play(in_terminal=not args.silent)
\ No newline at end of file
+    rng = spawn_rng(args.seed) if args.seed is not None else None
+    game = Game.Game(players, args.cubes, args.min, args.max, args.remove, rng=rng)
+    if args.spectate:
+        spectate(game, fps=args.fps, rounds_per_second=args.speed)
+    else:
+        game.play(in_terminal=not args.silent)
\ No newline at end of file
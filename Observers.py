@@ -0,0 +1,104 @@
+from collections import Counter, defaultdict
+from typing import List
+
+
+class Observer:
+    """Base class for Game hooks, attach with Game(observers=[...]) or game.add_observer.
+    All hooks are called before the game state changes:
+    - on_round_start(game): game.num is the number of the new round
+    - on_decision(game, player, choice, seconds): a strategy (or human) chose "p" or "t"
+    - on_take(game, player, forced): player takes game.num and game.pile,
+      forced is True when the player had no cubes left
+    - on_game_end(game): after the last round of play()
+    """
+
+    def on_round_start(self, game):
+        pass
+
+    def on_decision(self, game, player, choice, seconds):
+        pass
+
+    def on_take(self, game, player, forced):
+        pass
+
+    def on_game_end(self, game):
+        pass
+
+    def report(self) -> List[str]:
+        return []
+
+
+class TimingObserver(Observer):
+    """Decision latency per strategy"""
+
+    def __init__(self):
+        self.decisions = Counter()
+        self.total = defaultdict(float)
+        self.slowest = defaultdict(float)
+
+    def on_decision(self, game, player, choice, seconds):
+        name = player.strategy.name
+        self.decisions[name] += 1
+        self.total[name] += seconds
+        if seconds > self.slowest[name]:
+            self.slowest[name] = seconds
+
+    def report(self) -> List[str]:
+        lines = ["=== Decision latency ==="]
+        for name, count in self.decisions.most_common():
+            mean = self.total[name] / count
+            lines.append(f"{name:32} | Decisions: {count:8} | Mean: {mean * 1e6:8.2f} us | Max: {self.slowest[name] * 1e6:8.2f} us")
+        return lines
+
+
+class CounterObserver(Observer):
+    """Turns per round, pile size when taken and cube flow per strategy"""
+
+    def __init__(self):
+        self.games = 0
+        self.rounds = 0
+        self.turns_per_round = Counter()
+        self.pile_when_taken = Counter()
+        self.forced_takes = 0
+        self.cubes_paid = Counter()  # strategy -> cubes put in the pile
+        self.cubes_taken = Counter()  # strategy -> cubes collected from the pile
+        self.round_start_turn = 0
+
+    def on_round_start(self, game):
+        self.rounds += 1
+        self.round_start_turn = game.turn_counter
+
+    def on_decision(self, game, player, choice, seconds):
+        if choice == "p":
+            self.cubes_paid[player.strategy.name] += 1
+
+    def on_take(self, game, player, forced):
+        self.turns_per_round[game.turn_counter - self.round_start_turn] += 1
+        self.pile_when_taken[game.pile] += 1
+        self.cubes_taken[player.strategy.name] += game.pile
+        self.forced_takes += forced
+
+    def on_game_end(self, game):
+        self.games += 1
+
+    def report(self) -> List[str]:
+        lines = [f"=== Counters: {self.games} games, {self.rounds} rounds, {self.forced_takes} forced takes ==="]
+        lines.append("Turns per round: " + histogram_text(self.turns_per_round))
+        lines.append("Pile when taken: " + histogram_text(self.pile_when_taken))
+        for name in sorted(set(self.cubes_paid) | set(self.cubes_taken)):
+            paid, taken = self.cubes_paid[name], self.cubes_taken[name]
+            lines.append(f"{name:32} | Cubes paid: {paid:8} | Cubes taken: {taken:8} | Net: {taken - paid:+8}")
+        return lines
+
+
+def histogram_text(counter: Counter) -> str:
+    total = sum(counter.values())
+    if not total:
+        return "<empty>"
+    return " ".join(f"{k}:{v / total:.1%}" for k, v in sorted(counter.items()))
+
+
+def print_report(observers: List[Observer]):
+    for observer in observers:
+        for line in observer.report():
+            print(line)
@@ -0,0 +1,288 @@
+import argparse
+import math
+import os
+
+import numpy as np
+
+from Training import *
+
+POPULATION_SIZE = 10
+BENCHMARK_GAMES = 200  # Games per benchmark of a recommendation (not counted as evaluations)
+BENCHMARK_EVERY = 5  # Generations between benchmarks
+TARGET_SAMPLES = 20  # Random params benchmarked to set a default target
+TARGET_QUANTILE = 0.9  # The default target beats this share of random params
+
+
+class ParamSpace:
+	"""The searched params of a param_template: (low, high) tuples are searched, other
+	values are passed through. Optimizers work on vectors in the unit box [0, 1]^n,
+	params() maps a vector back, clipping to the box and rounding integer params.
+	"""
+
+	def __init__(self, param_template, integer_params=()):
+		self.template = param_template
+		self.keys = [k for k, v in param_template.items() if isinstance(v, tuple)]
+		self.integer = set(integer_params)
+		unknown = self.integer - set(self.keys)
+		if unknown:
+			raise KeyError(f"Integer params not in the template: {', '.join(sorted(unknown))}")
+
+	@property
+	def dims(self) -> int:
+		return len(self.keys)
+
+	def params(self, vector) -> dict:
+		params = dict(self.template)
+		for k, x in zip(self.keys, vector):
+			low, high = self.template[k]
+			value = low + min(1.0, max(0.0, float(x))) * (high - low)
+			params[k] = int(round(value)) if k in self.integer else value
+		return params
+
+	def vector(self, params) -> list:
+		return [(params[k] - low) / (high - low) if high > low else 0.0
+			for k, (low, high) in ((k, self.template[k]) for k in self.keys)]
+
+
+class Optimizer:
+	"""Ask/tell interface: ask() returns a batch of params to evaluate (all of them
+	can run in parallel), tell() takes their scores (higher is better) in the same
+	order. recommendation() is the params the optimizer currently believes best.
+	"""
+
+	name = "optimizer"
+
+	def ask(self) -> list:
+		raise NotImplementedError
+
+	def tell(self, batch: list, scores: list):
+		raise NotImplementedError
+
+	def recommendation(self) -> dict:
+		raise NotImplementedError
+
+
+class GeneticOptimizer(Optimizer):
+	"""The mutate-and-select step of genetic_algorithm: keep the top half and refill
+	with mutated copies
+	"""
+
+	name = "ga"
+
+	def __init__(self, strategy_cls, space: ParamSpace, rng, population_size=POPULATION_SIZE):
+		self.strategy_cls = strategy_cls
+		self.space = space
+		self.rng = rng
+		self.population_size = population_size
+		self.population = [random_individual(strategy_cls, space.template, rng) for _ in range(population_size)]
+		self.best = None
+
+	def round_integers(self, params):
+		return {k: int(round(v)) if k in self.space.integer else v for k, v in params.items()}
+
+	def ask(self):
+		return [self.round_integers(ind["params"]) for ind in self.population]
+
+	def tell(self, batch, scores):
+		ranked = sorted(zip(scores, range(len(batch))), key=lambda item: item[0], reverse=True)
+		top_half = [{"strategy_cls": self.strategy_cls, "params": batch[i], "score": score}
+			for score, i in ranked[:self.population_size // 2]]
+		self.best = top_half[0]["params"]
+		self.population = reproduce(top_half, self.strategy_cls, self.space.template, self.population_size, self.rng)
+
+	def recommendation(self):
+		return self.best if self.best is not None else self.ask()[0]
+
+
+class CMAESOptimizer(Optimizer):
+	"""(mu/mu_w, lambda) CMA-ES on the unit box of a ParamSpace (Hansen, "The CMA
+	Evolution Strategy: A Tutorial"). Samples outside the box are clipped before they
+	are evaluated and the clipped point is used for the update. Integer params are
+	evaluated rounded while the distribution stays continuous.
+	"""
+
+	name = "cmaes"
+
+	def __init__(self, space: ParamSpace, rng, population_size=POPULATION_SIZE, sigma=0.3, mean=None):
+		n = space.dims
+		self.space = space
+		self.np_rng = np.random.default_rng(rng.getrandbits(64))
+		self.mean = np.full(n, 0.5) if mean is None else np.clip(np.asarray(space.vector(mean), dtype=float), 0, 1)
+		self.sigma = sigma
+		self.lam = max(population_size, 4 + int(3 * math.log(max(n, 1))))
+		self.mu = self.lam // 2
+		weights = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+		self.weights = weights / weights.sum()
+		self.mueff = 1 / np.sum(self.weights ** 2)
+
+		self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+		self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+		self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+		self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+		self.damps = 1 + 2 * max(0.0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+		self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n * n))
+
+		self.pc = np.zeros(n)
+		self.ps = np.zeros(n)
+		self.C = np.eye(n)
+		self.B = np.eye(n)
+		self.D = np.ones(n)
+		self.generation = 0
+		self.points = None
+
+	def ask(self):
+		z = self.np_rng.standard_normal((self.lam, self.space.dims))
+		self.points = np.clip(self.mean + self.sigma * (z * self.D) @ self.B.T, 0.0, 1.0)
+		return [self.space.params(x) for x in self.points]
+
+	def tell(self, batch, scores):
+		n = self.space.dims
+		order = np.argsort(-np.asarray(scores, dtype=float), kind="stable")[:self.mu]
+		old_mean = self.mean
+		y = (self.points[order] - old_mean) / self.sigma
+		y_w = self.weights @ y
+		self.mean = old_mean + self.sigma * y_w
+
+		inv_sqrt_C = self.B @ np.diag(1 / self.D) @ self.B.T
+		self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * (inv_sqrt_C @ y_w)
+		self.generation += 1
+		ps_norm = np.linalg.norm(self.ps)
+		h_sigma = ps_norm / math.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) < (1.4 + 2 / (n + 1)) * self.chi_n
+		self.pc = (1 - self.cc) * self.pc + h_sigma * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+		rank_one = np.outer(self.pc, self.pc) + (not h_sigma) * self.cc * (2 - self.cc) * self.C
+		rank_mu = (y.T * self.weights) @ y
+		self.C = (1 - self.c1 - self.cmu) * self.C + self.c1 * rank_one + self.cmu * rank_mu
+		self.sigma *= math.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+
+		self.C = np.triu(self.C) + np.triu(self.C, 1).T
+		eigenvalues, self.B = np.linalg.eigh(self.C)
+		self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+	def recommendation(self):
+		return self.space.params(self.mean)
+
+
+OPTIMIZERS = {
+	"ga": lambda strategy_cls, space, rng, population_size: GeneticOptimizer(strategy_cls, space, rng, population_size),
+	"cmaes": lambda strategy_cls, space, rng, population_size: CMAESOptimizer(space, rng, population_size),
+}
+
+def evaluate_batch(strategy_cls, batch, rng, game_seed, pool=None, workers=None):
+	"""Scores of a batch of params with the evaluate loop of genetic_algorithm
+	(every candidate plays one game against 3 others of the batch)
+	"""
+	population = [{"strategy_cls": strategy_cls, "params": params, "score": 0} for params in batch]
+	evaluate_population(population, GA_GAME_CONFIG, rng, game_seed, pool, workers)
+	return [ind["score"] for ind in population]
+
+def benchmark(strategy_cls, params, games=BENCHMARK_GAMES, seed=0, pool=None, workers=None):
+	"""Mean score of params against 3 players of strategy_cls with its default params.
+	Games use spawn_rng(seed, "benchmark", j), so every recommendation sees the same games.
+	"""
+	individual = {"strategy_cls": strategy_cls, "params": params}
+	opponents = [{"strategy_cls": strategy_cls, "params": {}}] * 3
+	payloads = [get_payload(individual, opponents, GA_GAME_CONFIG, (seed, "benchmark", j)) for j in range(games)]
+	if pool is not None:
+		scores = pool.map(evaluate_payload, payloads, chunksize=get_chunksize(len(payloads), workers))
+	else:
+		scores = list(map(evaluate_payload, payloads))
+	return sum(scores) / games
+
+def optimize(optimizer, strategy_cls, evaluations, seed=0, run=0, target=None, pool=None, workers=None,
+		benchmark_every=BENCHMARK_EVERY, verbose=True):
+	"""Ask/tell loop until `evaluations` games were played.
+	Batch gen plays with spawn_rng(seed, optimizer.name, run, gen, i). Every
+	benchmark_every generations the recommendation is benchmarked (the same games
+	for every run), the run stops early once it reaches target. Returns the recommendation, its last benchmark and the
+	evaluations used when the target was reached (None if never).
+	"""
+	rng = spawn_rng(seed, optimizer.name, run, "opponents")
+	used = 0
+	gen = 0
+	score = None
+	reached = None
+	while used < evaluations:
+		batch = optimizer.ask()
+		scores = evaluate_batch(strategy_cls, batch, rng, (seed, optimizer.name, run, gen), pool, workers)
+		optimizer.tell(batch, scores)
+		used += len(batch)
+		gen += 1
+		if gen % benchmark_every == 0 or used >= evaluations:
+			score = benchmark(strategy_cls, optimizer.recommendation(), seed=seed, pool=pool, workers=workers)
+			if verbose:
+				print(f"{optimizer.name:>5} | {used:6} evaluations | benchmark {score:6.2f} | {optimizer.recommendation()}")
+			if target is not None and score >= target:
+				reached = used
+				break
+	return optimizer.recommendation(), score, reached
+
+def get_target(strategy_cls, space, seed=0, pool=None, workers=None):
+	"""Default target: the benchmark score that TARGET_QUANTILE of TARGET_SAMPLES random
+	params do not reach, so it means the same for any strategy's score scale
+	"""
+	rng = spawn_rng(seed, "target")
+	scores = sorted(benchmark(strategy_cls, space.params([rng.random() for _ in range(space.dims)]),
+		seed=seed, pool=pool, workers=workers) for _ in range(TARGET_SAMPLES))
+	return scores[min(len(scores) - 1, int(TARGET_QUANTILE * len(scores)))]
+
+def compare_optimizers(strategy_cls, param_template, integer_params=(), evaluations=2000, runs=3, target=None,
+		population_size=POPULATION_SIZE, workers=None, seed=0, names=tuple(OPTIMIZERS)):
+	"""Run every optimizer `runs` times and print how many evaluations each needed to
+	reach the target benchmark score (default from get_target).
+	"""
+	space = ParamSpace(param_template, integer_params)
+	pool = None
+	if workers and workers > 1:
+		from multiprocessing import Pool  # Only paid for when a pool is used
+		pool = Pool(workers)
+	try:
+		baseline = benchmark(strategy_cls, {}, seed=seed, pool=pool, workers=workers)
+		print(f"Default params benchmark: {baseline:.2f}")
+		if target is None:
+			target = get_target(strategy_cls, space, seed, pool, workers)
+		print(f"Target benchmark: {target:.2f}")
+
+		results = {}
+		for name in names:
+			results[name] = []
+			for run in range(runs):
+				optimizer = OPTIMIZERS[name](strategy_cls, space, spawn_rng(seed, name, run), population_size)
+				results[name].append(optimize(optimizer, strategy_cls, evaluations, seed, run, target, pool, workers))
+	except BaseException:
+		# Don't wait for queued tasks after an error or Ctrl-C
+		if pool is not None:
+			pool.terminate()
+		raise
+	finally:
+		if pool is not None:
+			pool.close()
+			pool.join()
+
+	print(f"\n{'OPTIMIZER':>9} | REACHED | EVALUATIONS TO TARGET (median) | FINAL BENCHMARK (mean)")
+	for name, runs_results in results.items():
+		needed = sorted(reached for _, _, reached in runs_results if reached is not None)
+		median = f"{needed[len(needed) // 2]}" if needed else f"> {evaluations}"
+		final = sum(score for _, score, _ in runs_results) / len(runs_results)
+		print(f"{name:>9} | {len(needed):>3}/{len(runs_results):<3} | {median:>30} | {final:.2f}")
+	return results
+
+
+if __name__ == "__main__":
+	from Arena2 import STRATEGY_TRAINING_CONFIGS
+
+	names = [config["name"] for config in STRATEGY_TRAINING_CONFIGS]
+	parser = argparse.ArgumentParser(description="Compare strategy param optimizers by evaluations to a target score")
+	parser.add_argument("--strategy", choices=names, default=names[0], help=f"Strategy to train (default = {names[0]}).")
+	parser.add_argument("--optimizers", nargs="+", choices=list(OPTIMIZERS), default=list(OPTIMIZERS), help="Optimizers to compare (default = all).")
+	parser.add_argument("--evaluations", type=int, default=2000, help="Games per run (default = 2000).")
+	parser.add_argument("--runs", type=int, default=3, help="Runs per optimizer (default = 3).")
+	parser.add_argument("--target", type=float, default=None, help="Benchmark score to reach (default = beats 90%% of random params).")
+	parser.add_argument("--population", type=int, default=POPULATION_SIZE, help=f"Candidates per batch (default = {POPULATION_SIZE}).")
+	parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default = all cores).")
+	parser.add_argument("--seed", type=int, default=0, help="Root seed (default = 0).")
+	args = parser.parse_args()
+
+	config = STRATEGY_TRAINING_CONFIGS[names.index(args.strategy)]
+	compare_optimizers(config["class"], config["param_template"], config.get("integer_params", ()), args.evaluations,
+		args.runs, args.target, args.population, args.workers, args.seed, args.optimizers)
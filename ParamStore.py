@@ -0,0 +1,160 @@
+import argparse
+import glob
+import json
+import os
+import sqlite3
+import time
+
+PARAM_STORE = "params.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS params (
+    strategy TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    fitness REAL,
+    metadata TEXT,
+    created REAL NOT NULL,
+    PRIMARY KEY (strategy, version)
+)
+"""
+
+
+class ParamStore:
+    """Versioned strategy params in one SQLite file.
+    Every save adds a new version for the strategy, with optional fitness and
+    training metadata; load returns the latest version unless asked for another.
+    Latest params are cached in-process, the cache is updated on save. A new store
+    imports the best_params_<strategy>.json files next to it.
+    """
+
+    def __init__(self, path: str = PARAM_STORE):
+        self.path = path
+        self.cache = {}  # strategy name -> latest params
+        self.complete = False  # cache holds every strategy (after load_all)
+        self.pid = None
+        self.db = None
+        created = not os.path.exists(path)
+        self.connect()
+        if created:
+            self.import_json(os.path.dirname(path) or ".")
+
+    def connect(self):
+        self.db = sqlite3.connect(self.path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(SCHEMA)
+        self.pid = os.getpid()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # A connection can't be shared with forked worker processes
+        if self.pid != os.getpid():
+            self.connect()
+        return self.db
+
+    def save(self, strategy: str, params: dict, fitness: float = None, metadata: dict = None) -> int:
+        """Store params as the next version of strategy, returns the version"""
+        with self.connection as db:
+            (version,) = db.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM params WHERE strategy = ?",
+                                    (strategy,)).fetchone()
+            db.execute("INSERT INTO params VALUES (?, ?, ?, ?, ?, ?)",
+                       (strategy, version, json.dumps(params), fitness,
+                        json.dumps(metadata) if metadata is not None else None, time.time()))
+        self.cache[strategy] = dict(params)
+        return version
+
+    def load(self, strategy: str, version: int = None):
+        """Params of strategy (latest version by default), None if there are none"""
+        if version is None:
+            if strategy in self.cache:
+                return dict(self.cache[strategy])
+            if self.complete:
+                return None
+            row = self.connection.execute(
+                "SELECT params FROM params WHERE strategy = ? ORDER BY version DESC LIMIT 1", (strategy,)).fetchone()
+            if row is None:
+                return None
+            self.cache[strategy] = json.loads(row[0])
+            return dict(self.cache[strategy])
+        row = self.connection.execute(
+            "SELECT params FROM params WHERE strategy = ? AND version = ?", (strategy, version)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def load_all(self) -> dict:
+        """Latest params of every strategy in one query, {strategy name: params}"""
+        if not self.complete:
+            rows = self.connection.execute(
+                "SELECT strategy, params FROM params AS p WHERE version = "
+                "(SELECT MAX(version) FROM params WHERE strategy = p.strategy)").fetchall()
+            self.cache = {strategy: json.loads(params) for strategy, params in rows}
+            self.complete = True
+        return {strategy: dict(params) for strategy, params in self.cache.items()}
+
+    def history(self, strategy: str) -> list:
+        """Every version of strategy, oldest first, as dicts"""
+        rows = self.connection.execute(
+            "SELECT version, params, fitness, metadata, created FROM params WHERE strategy = ? ORDER BY version",
+            (strategy,)).fetchall()
+        return [{"version": version, "params": json.loads(params), "fitness": fitness,
+                 "metadata": json.loads(metadata) if metadata is not None else None, "created": created}
+                for version, params, fitness, metadata, created in rows]
+
+    def strategies(self) -> list:
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT strategy FROM params ORDER BY strategy")]
+
+    def import_json(self, directory: str = ".") -> list:
+        """Add best_params_<strategy>.json files as new versions, skipping files whose
+        params are already stored (in any version). Returns the imported strategy names.
+        """
+        imported = []
+        for filename in sorted(glob.glob(os.path.join(directory, "best_params_*.json"))):
+            strategy = os.path.basename(filename)[len("best_params_"):-len(".json")]
+            with open(filename, "r") as f:
+                params = json.load(f)
+            if all(entry["params"] != params for entry in self.history(strategy)):
+                self.save(strategy, params, metadata={"source": os.path.basename(filename)})
+                imported.append(strategy)
+        return imported
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+STORES = {}  # path -> ParamStore, one per process
+
+
+def get_param_store(path: str = PARAM_STORE) -> ParamStore:
+    store = STORES.get(path)
+    if store is None:
+        store = STORES[path] = ParamStore(path)
+    return store
+
+
+def print_store(store: ParamStore):
+    print(f"{'STRATEGY':25} | VERSION | FITNESS | PARAMS")
+    latest = store.load_all()
+    for strategy in sorted(latest):
+        entry = store.history(strategy)[-1]
+        fitness = f"{entry['fitness']:.2f}" if entry["fitness"] is not None else "-"
+        print(f"{strategy:25} | {entry['version']:7} | {fitness:>7} | {latest[strategy]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or import the saved strategy params")
+    parser.add_argument("--store", default=PARAM_STORE, help=f"Store file (default = {PARAM_STORE}).")
+    parser.add_argument("--history", default=None, metavar="STRATEGY", help="Print every version of STRATEGY.")
+    parser.add_argument("--import-json", default=None, metavar="DIR", help="Import best_params_*.json files from DIR.")
+    args = parser.parse_args()
+
+    store = get_param_store(args.store)
+    if args.import_json:
+        imported = store.import_json(args.import_json)
+        print(f"Imported {len(imported)} strategies: {', '.join(imported)}" if imported else "Nothing new to import")
+    if args.history:
+        for entry in store.history(args.history):
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["created"]))
+            print(f"v{entry['version']} {created} fitness={entry['fitness']} {entry['params']} {entry['metadata'] or ''}")
+    else:
+        print_store(store)
@@ -1,10 +1,55 @@
 from Utils import *
 
 
+class NumberView:
+    """Read-only list-like view of the numbers owned by a player (in ascending order).
+    Membership checks are O(1). append() is kept for code that still does
+    player.numbers.append(n) and forwards to Player.take_number.
+    """
+    __slots__ = ("_player",)
+
+    def __init__(self, player):
+        self._player = player
+
+    def __iter__(self):
+        mask = self._player._mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def __len__(self):
+        return self._player._mask.bit_count()
+
+    def __bool__(self):
+        return self._player._mask != 0
+
+    def __contains__(self, n):
+        return n >= 0 and (self._player._mask >> n) & 1 == 1
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def append(self, n):
+        self._player.take_number(n)
+
+
 class Player:
     counter = 0  #Keep track of number of Player instances
     name_counter = 0 
 
+    __slots__ = ("strategy", "_name", "cubes", "color", "_played_by_human",
+                 "_mask", "_starts", "_start_sum", "_number_sum")
+
     @classmethod
     def get_next_color(cls):
         color_keys = list(ANSI_COLORS.keys())
@@ -23,9 +68,80 @@ class Player:
         self._name = name
         self.cubes = cubes if cubes!= None else 0
         self.color = color if color!= None else Player.get_next_color()
-        self.numbers = [] #Keep track of what numbers belong to this player
         self._played_by_human = played_by_human
 
+        # Owned numbers as a bitmask (bit n set = owns n). The first number of every
+        # ladder and their sum are kept up to date in take_number.
+        self._mask = 0
+        self._starts = 0
+        self._start_sum = 0
+        self._number_sum = 0
+
+    @property
+    def numbers(self) -> NumberView:
+        """Numbers that belong to this player"""
+        return NumberView(self)
+
+    def take_number(self, n: int):
+        """Give number n (non-negative) to this player"""
+        bit = 1 << n
+        if self._mask & bit:
+            return
+        if not self._mask & (bit >> 1):  # n starts a new ladder
+            self._starts |= bit
+            self._start_sum += n
+        if self._mask & (bit << 1):  # n+1 no longer starts a ladder
+            self._starts &= ~(bit << 1)
+            self._start_sum -= n + 1
+        self._mask |= bit
+        self._number_sum += n
+
+    def owns(self, n: int) -> bool:
+        return n >= 0 and (self._mask >> n) & 1 == 1
+
+    def is_adjacent(self, n: int) -> bool:
+        """True if the player owns n-1 or n+1"""
+        if n <= 0:
+            return n == 0 and self._mask & 2 != 0
+        return (self._mask >> (n - 1)) & 0b101 != 0
+
+    def owns_within(self, n: int, distance) -> bool:
+        """True if the player owns a number m with abs(m - n) <= distance"""
+        if distance < 0:
+            return False
+        distance = int(distance)
+        low = max(n - distance, 0)
+        high = n + distance
+        if high < low:
+            return False
+        return (self._mask >> low) & ((1 << (high - low + 1)) - 1) != 0
+
+    @property
+    def mask(self) -> int:
+        """Owned numbers as a bitmask, bit n set = owns n"""
+        return self._mask
+
+    @property
+    def number_sum(self) -> int:
+        return self._number_sum
+
+    def get_state(self) -> tuple:
+        """Everything that changes during play, see Game.snapshot"""
+        return (self.cubes, self._mask, self._starts, self._start_sum, self._number_sum)
+
+    def set_state(self, state: tuple):
+        self.cubes, self._mask, self._starts, self._start_sum, self._number_sum = state
+
+    def copy(self) -> "Player":
+        """Copy sharing name, color and strategy"""
+        new = Player.__new__(Player)
+        new.strategy = self.strategy
+        new._name = self._name
+        new.color = self.color
+        new._played_by_human = self._played_by_human
+        new.set_state(self.get_state())
+        return new
+
     @property
     def played_by_human(self):
         return self._played_by_human
@@ -45,16 +161,7 @@ class Player:
 
     @property
     def score(self) -> float:
-        sorted_nums = sorted(set(self.numbers))
-        score = 0
-        i = 0
-        while i < len(sorted_nums):
-            start = i
-            while i + 1 < len(sorted_nums) and sorted_nums[i + 1] == sorted_nums[i] + 1:
-                i += 1
-            score += sorted_nums[start]
-            i += 1
-        return 95 - score + self.cubes
+        return 95 - self._start_sum + self.cubes
 
     @property
     def ladders(self) -> List[List[int]]:
@@ -62,17 +169,17 @@ class Player:
         [[ladder1], [ladder2], ...] 
         (ladder looks like [n1, n2, n3, ...])
         """
-        sorted_nums = sorted(set(self.numbers))
         res = []
-        current = []
-        for i, n in enumerate(sorted_nums):
-            if n-1>=0 and sorted_nums[i-1] == n - 1:  # Is ladder
-                current.append(n)
-            else:
-                if current:
-                    res.append(current)
-                current = [n]
-        res.append(current)
+        starts = self._starts
+        while starts:
+            low = starts & -starts
+            n = low.bit_length() - 1
+            ladder = [n]
+            while (self._mask >> (n + 1)) & 1:
+                n += 1
+                ladder.append(n)
+            res.append(ladder)
+            starts ^= low
         return res
 
     def get_numbers_formatted_as_ladders(self) -> str:
@@ -0,0 +1,182 @@
+import argparse
+import math
+import os
+import random
+
+from Game import *
+from Strategy import get_strategy_class
+from Training import get_chunksize
+from StrategyEvaluator import GAME_CONFIG, PLAYERS_PER_GAME
+import Player
+
+# Weng-Lin (Bradley-Terry, full pairing) defaults, on the familiar TrueSkill scale
+MU = 25.0
+SIGMA = MU / 3
+BETA = SIGMA / 2
+KAPPA = 0.0001  # Keeps sigma from collapsing to 0 after surprising results
+
+MATCH_CANDIDATES = 16  # Opponents are picked among this many random entrants
+
+
+class Rating:
+    __slots__ = ("mu", "sigma", "games")
+
+    def __init__(self, mu: float = MU, sigma: float = SIGMA):
+        self.mu = mu
+        self.sigma = sigma
+        self.games = 0
+
+    @property
+    def conservative(self) -> float:
+        """mu - 3 sigma: the rating the entrant is very likely to be above"""
+        return self.mu - 3 * self.sigma
+
+    def __repr__(self):
+        return f"Rating(mu={self.mu:.2f}, sigma={self.sigma:.2f})"
+
+
+def rate_game(ratings, scores, beta: float = BETA, kappa: float = KAPPA):
+    """Update the ratings of one game in place (Weng & Lin 2011, Bradley-Terry full pairing).
+    Every pair of players counts as a comparison: higher score wins, equal scores tie.
+    """
+    updates = []
+    for i, a in enumerate(ratings):
+        omega = 0.0
+        delta = 0.0
+        for q, b in enumerate(ratings):
+            if q == i:
+                continue
+            c = math.sqrt(a.sigma ** 2 + b.sigma ** 2 + 2 * beta ** 2)
+            p = 1 / (1 + math.exp((b.mu - a.mu) / c))
+            s = 1.0 if scores[i] > scores[q] else 0.5 if scores[i] == scores[q] else 0.0
+            omega += a.sigma ** 2 / c * (s - p)
+            delta += (a.sigma / c) * a.sigma ** 2 / c ** 2 * p * (1 - p)
+        updates.append((omega, delta))
+
+    for rating, (omega, delta) in zip(ratings, updates):
+        rating.mu += omega
+        rating.sigma *= math.sqrt(max(1 - delta, kappa))
+        rating.games += 1
+
+
+class Matchmaker:
+    """Picks tables that teach the ratings the most.
+    The entrant with the highest sigma anchors the table, the other seats go to the
+    entrants closest in mu among a random sample, since games between similar
+    entrants have the least predictable result. Every game lowers the sigma of
+    everyone at the table, so each entrant needs about the same number of games
+    and the league's total grows linearly with its size.
+    """
+
+    def __init__(self, ratings: dict, rng: random.Random, candidates: int = MATCH_CANDIDATES):
+        self.ratings = ratings
+        self.rng = rng
+        self.candidates = candidates
+
+    def tables(self, n_tables: int, players_per_game: int) -> list:
+        """Up to n_tables tables without shared entrants (so they can be played at once)"""
+        free = set(self.ratings)
+        tables = []
+        while len(tables) < n_tables and len(free) >= players_per_game:
+            # Sorted first, so the rng draws don't depend on set (hash) order
+            anchor = max(sorted(free), key=lambda e: (self.ratings[e].sigma, self.rng.random()))
+            free.discard(anchor)
+            sample = self.rng.sample(sorted(free), min(self.candidates, len(free)))
+            mu = self.ratings[anchor].mu
+            sample.sort(key=lambda e: abs(self.ratings[e].mu - mu))
+            table = [anchor] + sample[:players_per_game - 1]
+            self.rng.shuffle(table)
+            free.difference_update(table)
+            tables.append(table)
+        return tables
+
+
+def play_table(task):
+    """Scores of one game in seat order, task = (seating of (class name, params), seed path)"""
+    seating, game_seed = task
+    players = [Player.Player(GENERIC_NAMES[seat % len(GENERIC_NAMES)], get_strategy_class(name)(**params))
+               for seat, (name, params) in enumerate(seating)]
+    game = Game(players, GAME_CONFIG["cubes"], GAME_CONFIG["min"], GAME_CONFIG["max"], GAME_CONFIG["remove"],
+                rng=spawn_rng(*game_seed))
+    game.play()
+    return [player.score for player in players]
+
+
+def run_league(entries: dict, games: int, players_per_game: int = PLAYERS_PER_GAME, seed: int = 0,
+               workers: int = None, batch: int = None, ratings: dict = None) -> dict:
+    """Play `games` games between entries ({label: (class name, params)}) chosen by the
+    Matchmaker, rating after every batch of tables. Returns {label: Rating}.
+    Pass the ratings of an earlier run to continue a league.
+    """
+    rng = random.Random(seed)
+    ratings = ratings if ratings is not None else {}
+    for label in entries:
+        ratings.setdefault(label, Rating())
+    matchmaker = Matchmaker(ratings, rng)
+    if batch is None:
+        batch = max(1, len(entries) // players_per_game)
+
+    pool = None
+    if workers and workers > 1:
+        from multiprocessing import Pool
+        pool = Pool(workers)
+    try:
+        played = 0
+        while played < games:
+            tables = matchmaker.tables(min(batch, games - played), players_per_game)
+            tasks = [([entries[label] for label in table], (seed, played + i)) for i, table in enumerate(tables)]
+            if pool:
+                results = pool.map(play_table, tasks, get_chunksize(len(tasks), workers))
+            else:
+                results = map(play_table, tasks)
+            for table, scores in zip(tables, results):
+                rate_game([ratings[label] for label in table], scores)
+            played += len(tables)
+    except BaseException:
+        # Don't wait for queued tasks after an error or Ctrl-C
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return ratings
+
+
+def print_ratings(ratings: dict, top: int = None):
+    print("\n=== Ratings (by mu - 3 sigma) ===")
+    ranked = sorted(ratings.items(), key=lambda item: item[1].conservative, reverse=True)
+    for label, rating in ranked[:top]:
+        print(f"{label:40} | Rating: {rating.conservative:6.2f} | Mu: {rating.mu:6.2f} "
+              f"| Sigma: {rating.sigma:5.2f} | Games: {rating.games}")
+
+
+def get_variants(training_configs, n_variants: int, rng: random.Random) -> dict:
+    """n_variants random param sets per strategy from the GA param templates"""
+    entries = {}
+    for config in training_configs:
+        for v in range(n_variants):
+            params = {k: rng.uniform(*r) if isinstance(r, tuple) else r
+                      for k, r in config["param_template"].items()}
+            entries[f"{config['name']}#{v}"] = (config["name"], params)
+    return entries
+
+
+if __name__ == "__main__":
+    from Arena2 import STRATEGY_TRAINING_CONFIGS
+
+    parser = argparse.ArgumentParser(description="Rate many strategy variants with a matchmade league")
+    parser.add_argument("--variants", type=int, default=40, help="Random param sets per strategy (default = 40).")
+    parser.add_argument("--games-per-entrant", type=int, default=30, help="Games to play per entrant (default = 30).")
+    parser.add_argument("--players", type=int, default=PLAYERS_PER_GAME, help=f"Players per game (default = {PLAYERS_PER_GAME}).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default = all cores).")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed (default = 0).")
+    parser.add_argument("--top", type=int, default=25, help="Entrants to print (default = 25).")
+    args = parser.parse_args()
+
+    entries = get_variants(STRATEGY_TRAINING_CONFIGS, args.variants, random.Random(args.seed))
+    games = len(entries) * args.games_per_entrant // args.players
+    print(f"{len(entries)} entrants, {games} games")
+    ratings = run_league(entries, games, args.players, args.seed, args.workers)
+    print_ratings(ratings, args.top)
@@ -0,0 +1,140 @@
+import sys
+import time
+
+from Observers import Observer
+from Player import *
+
+CURSOR_HIDE = "\033[?25l"
+CURSOR_SHOW = "\033[?25h"
+CLEAR_LINE_END = "\033[K"
+SEPARATOR = "  |+|  "
+
+
+def move_to(row: int, col: int) -> str:
+    """Cursor addressing escape code, rows and columns start at 1"""
+    return f"\033[{row};{col}H"
+
+
+class TerminalRenderer(Observer):
+    """Draws the board and scoreboard with cursor addressing and only redraws what changed.
+
+    The board layout matches Game.get_board (a new row after every multiple of 5).
+    Board cells are marked dirty by the observer hooks (the new number at round start,
+    the taken number on take), scoreboard and status lines are diffed against the
+    previous frame. render() writes one frame with a single write and flush.
+    """
+
+    def __init__(self, game, out=None):
+        self.game = game
+        self.out = out if out is not None else sys.stdout
+        self.cell_width = max(4, len(str(game.highest_number - 1)) + 2)
+        self.cells = {}  # number -> (row, col)
+        row, col = 1, 1
+        for n in range(game.lowest_number, game.highest_number):
+            self.cells[n] = (row, col)
+            col += self.cell_width
+            if n % 5 == 0:
+                row, col = row + 1, 1
+        self.board_rows = row if col > 1 else row - 1
+        self.board_width = 5 * self.cell_width
+        self.owner = {}
+        for player in game.players:
+            for n in player.numbers:
+                self.owner[n] = player
+        self.dirty = set(self.cells)
+        self.lines = {}  # screen row -> text drawn there (scoreboard and status)
+        self.last_take = ""
+        self.status = ""
+        self.frames = 0
+        self.drawn = False
+
+    def format_cell(self, n: int) -> str:
+        text = str(n).rjust(self.cell_width - 2)
+        if n == self.game.num:
+            return color_text("white", f"({text})")
+        player = self.owner.get(n)
+        if player is not None:
+            return color_text(player.color, f"[{text}]")
+        return color_text("black", f"[{text}]")
+
+    def on_round_start(self, game):
+        self.dirty.add(game.num)
+
+    def on_take(self, game, player, forced):
+        self.owner[game.num] = player
+        self.dirty.add(game.num)
+        pile = f" & Pile({format_pile(game.pile)})" if game.pile else ""
+        self.last_take = f"{player.name} <-- [{game.num}]{pile}"
+
+    def set_line(self, row: int, text: str, col: int, parts: list):
+        if self.lines.get(row) != text:
+            self.lines[row] = text
+            parts.append(move_to(row, col) + text + CLEAR_LINE_END)
+
+    def render(self):
+        """Write everything that changed since the last frame"""
+        parts = []
+        if not self.drawn:
+            parts.append(CURSOR_HIDE + CLEAR_SCREEN)
+            for row in range(1, max(self.board_rows, len(self.game.players) + 1) + 1):
+                parts.append(move_to(row, self.board_width + 1) + SEPARATOR)
+            self.drawn = True
+
+        for n in self.dirty:
+            row, col = self.cells[n]
+            parts.append(move_to(row, col) + self.format_cell(n))
+        self.dirty.clear()
+
+        score_col = self.board_width + len(SEPARATOR) + 1
+        for row, line in enumerate(self.game.get_scoreboard(), 1):
+            self.set_line(row, line, score_col, parts)
+
+        status_row = max(self.board_rows, len(self.game.players) + 1) + 2
+        game = self.game
+        self.set_line(status_row, f"ROUND {game.round_counter}/{game.round_counter + game.rounds_left} "
+                                  f"| NUMBERS LEFT {game.rounds_left}", 1, parts)
+        self.set_line(status_row + 1, self.last_take, 1, parts)
+        self.set_line(status_row + 2, self.status, 1, parts)
+        parts.append(move_to(status_row + 3, 1))
+
+        self.out.write("".join(parts))
+        self.out.flush()
+        self.frames += 1
+
+    def close(self):
+        self.out.write(CURSOR_SHOW)
+        self.out.flush()
+
+
+def spectate(game, fps: float = 30, rounds_per_second: float = 10, out=None):
+    """Play an all-bot game on screen.
+    The game advances rounds_per_second rounds per second and at most fps frames are
+    drawn per second. When the game moves faster than the frame rate (or a frame is
+    late) several rounds are played before the next frame, the renderer redraws all
+    cells they touched at once.
+    """
+    renderer = TerminalRenderer(game, out)
+    game.add_observer(renderer)
+    frame_time = 1 / fps
+    start = time.perf_counter()
+    played = 0
+    try:
+        while game.rounds_left:
+            now = time.perf_counter()
+            due = min(int((now - start) * rounds_per_second) + 1, played + game.rounds_left)
+            if due > played:
+                while played < due:
+                    game.step()
+                    played += 1
+                fps_now = renderer.frames / (now - start) if now > start else 0.0
+                renderer.status = f"{fps_now:.1f} FPS | {played / (renderer.frames + 1):.2f} rounds per frame"
+                renderer.render()
+            delay = now + frame_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        game.notify("on_game_end")
+        renderer.status = "GAME FINISHED"
+        renderer.render()
+    finally:
+        renderer.close()
+    return renderer
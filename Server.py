@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import itertools
+import random
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from Strategy import *
+from Game import *
+from Training import load_best_params
+
+# Line protocol (UTF-8, one message per line, fields separated by spaces)
+#
+# Client -> server:
+#   JOIN <name> <humans> <bots>   Sit at a table for `humans` clients and `bots` bots,
+#                                 the table starts once all humans joined
+#   p / t                         Pay or take, only after YOUR_TURN
+#   STATS
+#   QUIT
+# Server -> client:
+#   WELCOME <protocol version>
+#   WAIT <table> <seat> <joined>/<humans>
+#   START <table> <seat> <cubes> <lowest> <highest> <name of seat 0> <name of seat 1> ...
+#   ROUND <round> <number> <numbers left>
+#   YOUR_TURN <number> <pile> <cubes> <seconds to answer>
+#   PAY <seat> <pile after paying>
+#   TAKE <seat> <number> <pile taken>
+#   TIMEOUT                       No answer in time, a bot decided for you
+#   END <score of seat 0> <score of seat 1> ...
+#   STATS <running tables> <connections> <games played> <human decisions>
+#   ERROR <message>
+#   BYE
+PROTOCOL_VERSION = 1
+
+HOST = "127.0.0.1"
+PORT = 8765
+TURN_TIMEOUT = 30.0  # Seconds a human has for a decision
+OUTBOX_SIZE = 256  # Messages queued per client before the table waits for it
+SEND_TIMEOUT = 5.0  # A client that can't take messages for this long is disconnected
+MAX_PLAYERS = 8
+BOT_THREADS = 4
+# Bots that decide faster than this (moving average) run on the event loop, handing
+# them to a thread costs more than the decision. Slower ones (e.g. MCTS) use the pool.
+INLINE_BOT_SECONDS = 0.0005
+
+GAME_CONFIG = {"cubes": 5, "min": 1, "max": 36, "remove": 3}
+
+BOT_STRATEGIES = [
+    CollectorStrategy,
+    RiskThresholdStrategy,
+    LadderBuilderStrategy,
+    CubeConserverStrategy,
+    GreedyLadderExtensionStrategy,
+]
+FALLBACK_STRATEGY = CollectorStrategy  # Decides for humans that time out or leave
+
+
+class Connection:
+    """One client. Outgoing messages go through a bounded queue that a writer task
+    drains, so a slow client makes its table wait (backpressure) instead of
+    growing memory, and is dropped after SEND_TIMEOUT.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.outbox = asyncio.Queue(OUTBOX_SIZE)
+        self.decisions = asyncio.Queue(1)
+        self.name = None
+        self.table = None
+        self.awaiting_decision = False
+        self.closed = False
+
+    async def send(self, *fields):
+        if self.closed:
+            return
+        line = " ".join(str(f) for f in fields)
+        try:
+            self.outbox.put_nowait(line)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self.outbox.put(line), SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.close()
+
+    async def write_loop(self):
+        """Write everything queued so far in one go, then wait until the socket buffer drains"""
+        try:
+            while True:
+                lines = [await self.outbox.get()]
+                while not self.outbox.empty():
+                    lines.append(self.outbox.get_nowait())
+                if None in lines:
+                    lines = lines[:lines.index(None)]
+                    if lines:
+                        self.writer.write(("\n".join(lines) + "\n").encode())
+                        await self.writer.drain()
+                    break
+                self.writer.write(("\n".join(lines) + "\n").encode())
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.closed = True
+            self.writer.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            if self.outbox.full():
+                # A client this far behind is dropped: drop a message so the stop
+                # sentinel fits (otherwise write_loop could wait on the queue
+                # forever) and close the socket to end a pending drain
+                self.outbox.get_nowait()
+                self.writer.close()
+            self.outbox.put_nowait(None)
+            if self.awaiting_decision and self.decisions.empty():
+                self.decisions.put_nowait(None)
+
+
+class Table:
+    """One game. Humans play through their Connection, bots through GameServer.bot_choice."""
+
+    def __init__(self, server: "GameServer", table_id: int, humans: int, bots: int):
+        self.server = server
+        self.id = table_id
+        self.humans = humans
+        self.bots = bots
+        self.connections = []
+        self.ready = asyncio.Event()
+
+    def join(self, connection: Connection) -> int:
+        self.connections.append(connection)
+        if len(self.connections) == self.humans:
+            self.ready.set()
+        return len(self.connections) - 1
+
+    async def broadcast(self, *fields):
+        for connection in self.connections:
+            await connection.send(*fields)
+
+    async def run(self):
+        await self.ready.wait()
+        try:
+            await self.play()
+        except Exception as e:
+            # Nobody awaits the table task, so report here instead of re-raising
+            print(f"Table {self.id} stopped:", file=sys.stderr)
+            traceback.print_exc()
+            await self.broadcast("ERROR", f"table {self.id} stopped: {e!r}")
+        finally:
+            for connection in self.connections:
+                connection.table = None
+
+    async def play(self):
+        server = self.server
+        rng = random.Random()
+        seating = [(connection.name, connection) for connection in self.connections]
+        seating += [(f"BOT-{GENERIC_NAMES[i % len(GENERIC_NAMES)]}", None) for i in range(self.bots)]
+        rng.shuffle(seating)
+        names = [name for name, _ in seating]
+        seats = {seat: connection for seat, (_, connection) in enumerate(seating) if connection is not None}
+        players = []
+        for name, connection in seating:
+            if connection is not None:
+                players.append(Player(name, server.new_strategy(FALLBACK_STRATEGY), played_by_human=True))
+            else:
+                players.append(Player(name, server.new_strategy(rng.choice(BOT_STRATEGIES))))
+        config = GAME_CONFIG
+        game = Game(players, config["cubes"], config["min"], config["max"], config["remove"], rng=rng)
+        for seat, connection in seats.items():
+            await connection.send("START", self.id, seat, config["cubes"], config["min"], config["max"], *names)
+
+        while game.rounds_left:
+            game.start_round()
+            await self.broadcast("ROUND", game.round_counter, game.num, game.rounds_left)
+            while game.num is not None:
+                player = game.next_player()
+                seat = game.turn_counter % len(players)
+                if player.cubes == 0:
+                    choice = "t"
+                elif seat in seats and not seats[seat].closed:
+                    choice = await self.ask(seats[seat], game, player)
+                else:
+                    choice = await server.bot_choice(game, player)
+                if choice == "p":
+                    game.pay(player)
+                    await self.broadcast("PAY", seat, game.pile)
+                else:
+                    await self.broadcast("TAKE", seat, game.num, game.pile)
+                    game.take(player)
+        await self.broadcast("END", *(player.score for player in players))
+        server.games_played += 1
+
+    async def ask(self, connection: Connection, game, player) -> str:
+        connection.awaiting_decision = True
+        await connection.send("YOUR_TURN", game.num, game.pile, player.cubes, TURN_TIMEOUT)
+        try:
+            choice = await asyncio.wait_for(connection.decisions.get(), TURN_TIMEOUT)
+        except asyncio.TimeoutError:
+            choice = None
+            await connection.send("TIMEOUT")
+        finally:
+            connection.awaiting_decision = False
+        if choice is None:
+            choice = await self.server.bot_choice(game, player)
+        self.server.decisions += 1
+        return choice
+
+
+def timed_choice(game, player):
+    start = time.perf_counter()
+    choice = player.strategy.make_choice(game, player)
+    return choice, time.perf_counter() - start
+
+
+class GameServer:
+    def __init__(self, bot_threads: int = BOT_THREADS):
+        self.executor = ThreadPoolExecutor(bot_threads)
+        self.table_ids = itertools.count()
+        self.waiting = {}  # (humans, bots) -> table that is not full yet
+        self.tables = set()
+        self.connections = 0
+        self.games_played = 0
+        self.decisions = 0
+        self.params = {cls: load_best_params(cls) or {} for cls in BOT_STRATEGIES + [FALLBACK_STRATEGY]}
+        self.bot_seconds = {}  # strategy class -> moving average of decision time
+
+    def new_strategy(self, strategy_cls) -> Strategy:
+        return strategy_cls(**self.params[strategy_cls])
+
+    async def bot_choice(self, game, player) -> str:
+        """Bot decision that never blocks the event loop for long: a strategy is timed
+        in the thread pool first and only runs inline while it stays fast
+        """
+        strategy_cls = type(player.strategy)
+        mean = self.bot_seconds.get(strategy_cls)
+        if mean is not None and mean < INLINE_BOT_SECONDS:
+            choice, seconds = timed_choice(game, player)
+        else:
+            loop = asyncio.get_running_loop()
+            choice, seconds = await loop.run_in_executor(self.executor, timed_choice, game, player)
+        self.bot_seconds[strategy_cls] = seconds if mean is None else 0.9 * mean + 0.1 * seconds
+        return choice
+
+    def get_table(self, humans: int, bots: int) -> Table:
+        table = self.waiting.get((humans, bots))
+        if table is None:
+            table = Table(self, next(self.table_ids), humans, bots)
+            self.waiting[(humans, bots)] = table
+            task = asyncio.create_task(table.run())
+            self.tables.add(task)
+            task.add_done_callback(self.tables.discard)
+        return table
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = Connection(reader, writer)
+        writer_task = asyncio.create_task(connection.write_loop())
+        self.connections += 1
+        await connection.send("WELCOME", PROTOCOL_VERSION)
+        try:
+            while not connection.closed:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):  # Longer than the stream limit
+                    await connection.send("ERROR", "line too long")
+                    break
+                if not line:
+                    break
+                fields = line.decode(errors="replace").split()
+                if not fields:
+                    continue
+                command = fields[0]
+                if command in ("p", "t"):
+                    if connection.awaiting_decision and connection.decisions.empty():
+                        connection.decisions.put_nowait(command)
+                    else:
+                        await connection.send("ERROR", "not your turn")
+                elif command == "JOIN":
+                    await self.join(connection, fields[1:])
+                elif command == "STATS":
+                    await connection.send("STATS", len(self.tables), self.connections, self.games_played, self.decisions)
+                elif command == "QUIT":
+                    await connection.send("BYE")
+                    break
+                else:
+                    await connection.send("ERROR", f"unknown command {command}")
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            table = connection.table
+            if table is not None and not table.ready.is_set():
+                table.connections.remove(connection)  # Left before the game started
+            connection.close()
+            await writer_task
+
+    async def join(self, connection: Connection, args):
+        if connection.table is not None:
+            await connection.send("ERROR", "already at a table")
+            return
+        try:
+            name, humans, bots = args[0], int(args[1]), int(args[2])
+        except (IndexError, ValueError):
+            await connection.send("ERROR", "usage: JOIN <name> <humans> <bots>")
+            return
+        if humans < 1 or bots < 0 or not 2 <= humans + bots <= MAX_PLAYERS:
+            await connection.send("ERROR", f"a table has 1+ humans and 2-{MAX_PLAYERS} players")
+            return
+        table = self.get_table(humans, bots)
+        if name in (c.name for c in table.connections):
+            name = f"{name}-{len(table.connections)}"
+        connection.name = name
+        connection.table = table
+        seat = table.join(connection)
+        if table.ready.is_set():
+            del self.waiting[(humans, bots)]
+        await table.broadcast("WAIT", table.id, seat, f"{len(table.connections)}/{humans}")
+
+    async def serve(self, host: str = HOST, port: int = PORT):
+        server = await asyncio.start_server(self.handle, host, port, limit=1 << 12, backlog=1024)
+        print(f"Serving Numbers & Ladders on {host}:{port}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host Numbers & Ladders tables over TCP")
+    parser.add_argument("--host", default=HOST, help=f"Address to listen on (default = {HOST}).")
+    parser.add_argument("--port", type=int, default=PORT, help=f"Port (default = {PORT}).")
+    parser.add_argument("--bot-threads", type=int, default=BOT_THREADS, help=f"Threads for bot decisions (default = {BOT_THREADS}).")
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer(args.bot_threads).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
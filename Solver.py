@@ -0,0 +1,230 @@
+import argparse
+import sys
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from Strategy import *
+
+
+def ladder_start_sum(mask: int, lowest_number: int) -> int:
+    """Sum of the first number of every ladder, bit i of mask = number lowest_number + i"""
+    starts = mask & ~(mask << 1)
+    total = 0
+    while starts:
+        low = starts & -starts
+        total += low.bit_length() - 1 + lowest_number
+        starts ^= low
+    return total
+
+
+class ExpectimaxSolver:
+    """Exact expected final scores for small games where every player maximizes
+    their own expected score.
+
+    States are stored relative to the player to act: cubes and owned masks are
+    rotated so index 0 is that player. This is also the symmetry reduction: the same
+    position reached with another seat to act shares its table entry.
+    The next number is uniform over the unseen numbers, which models both the
+    unknown deck order and the numbers removed at the start.
+
+    The transposition table is an LRU that evicts the least recently used entries
+    once it holds max_entries values.
+    """
+
+    BYTES_PER_ENTRY = 250  # Rough size of one key + value tuple pair
+
+    def __init__(self, lowest_number: int, highest_number: int, n_numbers_to_remove: int,
+                 n_players: int, max_entries: int = None, max_memory_mb: float = 512):
+        self.lowest_number = lowest_number
+        self.n_players = n_players
+        self.n_numbers = highest_number - lowest_number
+        self.total_rounds = self.n_numbers - n_numbers_to_remove
+        self.all_numbers = (1 << self.n_numbers) - 1
+        if max_entries is None:
+            max_entries = int(max_memory_mb * 1e6 / self.BYTES_PER_ENTRY)
+        self.max_entries = max_entries
+        self.table = OrderedDict()
+        self.nodes = 0
+        self.lookups = 0
+        self.hits = 0
+        self.evictions = 0
+        self.solve_time = 0.0
+
+    def store(self, key, value):
+        table = self.table
+        table[key] = value
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, key):
+        self.lookups += 1
+        value = self.table.get(key)
+        if value is not None:
+            self.hits += 1
+            self.table.move_to_end(key)
+        return value
+
+    def round_start(self, cubes: tuple, owned: tuple) -> tuple:
+        """Expected final scores before the next number is drawn (index 0 acts first)"""
+        key = (cubes, owned)
+        value = self.lookup(key)
+        if value is not None:
+            return value
+        self.nodes += 1
+
+        taken = 0
+        for mask in owned:
+            taken |= mask
+        if taken.bit_count() == self.total_rounds:
+            value = tuple(95 - ladder_start_sum(mask, self.lowest_number) + c
+                          for mask, c in zip(owned, cubes))
+        else:
+            unseen = self.all_numbers & ~taken
+            totals = [0.0] * self.n_players
+            count = 0
+            while unseen:
+                low = unseen & -unseen
+                for i, v in enumerate(self.decision(low.bit_length() - 1, 0, cubes, owned)):
+                    totals[i] += v
+                count += 1
+                unseen ^= low
+            value = tuple(t / count for t in totals)
+        self.store(key, value)
+        return value
+
+    def action_values(self, num: int, pile: int, cubes: tuple, owned: tuple) -> Tuple[tuple, tuple]:
+        """Expected final scores (take, pay) for the player at index 0.
+        pay is None if the player has no cubes.
+        """
+        # Take: the next round starts with the following player
+        taker_cubes = cubes[0] + pile
+        taker_owned = owned[0] | (1 << num)
+        after = self.round_start(cubes[1:] + (taker_cubes,), owned[1:] + (taker_owned,))
+        take = (after[-1],) + after[:-1]
+        if cubes[0] == 0:
+            return take, None
+
+        after = self.decision(num, pile + 1, cubes[1:] + (cubes[0] - 1,), owned[1:] + (owned[0],))
+        pay = (after[-1],) + after[:-1]
+        return take, pay
+
+    def decision(self, num: int, pile: int, cubes: tuple, owned: tuple) -> tuple:
+        key = (num, pile, cubes, owned)
+        value = self.lookup(key)
+        if value is not None:
+            return value
+        self.nodes += 1
+        take, pay = self.action_values(num, pile, cubes, owned)
+        value = pay if pay is not None and pay[0] > take[0] else take
+        self.store(key, value)
+        return value
+
+    def solve(self, n_starting_cubes_per_player: int) -> tuple:
+        """Expected final scores of the whole game, index 0 = the player acting first"""
+        return self.timed(self.round_start, (n_starting_cubes_per_player,) * self.n_players,
+                          (0,) * self.n_players)
+
+    def timed(self, function, *args):
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(limit, 20000))
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.solve_time += time.perf_counter() - start
+            sys.setrecursionlimit(limit)
+
+    def stats(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            "nodes_per_sec": self.nodes / self.solve_time if self.solve_time else 0.0,
+            "lookups": self.lookups,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "entries": len(self.table),
+            "evictions": self.evictions,
+            "seconds": self.solve_time,
+        }
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"Nodes: {s['nodes']} ({s['nodes_per_sec']:.0f}/s) | Table hit rate: {s['hit_rate']:.2%} "
+              f"| Entries: {s['entries']} | Evictions: {s['evictions']} | Time: {s['seconds']:.2f}s")
+
+
+class OptimalStrategy(Strategy):
+    """Plays the exact solution from ExpectimaxSolver. Only practical for small games
+    (e.g. numbers 1-12, 2-3 players and a few cubes).
+
+    Params:
+    - max_entries / max_memory_mb: size of the transposition table
+    """
+
+    def __init__(self, **params):
+        super().__init__(**params)
+        self.solvers = {}
+
+    def get_solver(self, game: Game) -> ExpectimaxSolver:
+        key = (game.lowest_number, game.highest_number, len(game.deck), len(game.players))
+        solver = self.solvers.get(key)
+        if solver is None:
+            solver = ExpectimaxSolver(
+                game.lowest_number, game.highest_number,
+                game.highest_number - game.lowest_number - len(game.deck),
+                len(game.players),
+                max_entries=self.params.get("max_entries"),
+                max_memory_mb=self.params.get("max_memory_mb", 512),
+            )
+            self.solvers[key] = solver
+        return solver
+
+    def make_choice(self, game: Game, player: Player):
+        solver = self.get_solver(game)
+        seat = game.players.index(player)
+        seated = game.players[seat:] + game.players[:seat]
+        cubes = tuple(p.cubes for p in seated)
+        owned = tuple(p.mask >> game.lowest_number for p in seated)
+        take, pay = solver.timed(solver.action_values, game.num - game.lowest_number, game.pile, cubes, owned)
+        if pay is not None and pay[0] > take[0]:
+            return "p"
+        return "t"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Solve small Numbers & Ladders games exactly")
+    parser.add_argument("--players", type=int, default=2, help="Total number of players.")
+    parser.add_argument("--cubes", type=int, default=2, help="Starting cubes per player (default=2).")
+    parser.add_argument("--min", type=int, default=1, help="Lowest number (default = 1).")
+    parser.add_argument("--max", type=int, default=10, help="Highest number, exclusive (default = 10).")
+    parser.add_argument("--remove", type=int, default=2, help="How many numbers to remove from the stack (default = 2).")
+    parser.add_argument("--games", type=int, default=200, help="Games per strategy when comparing against optimal play.")
+    parser.add_argument("--max-entries", type=int, default=None, help="Transposition table size.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    from Training import load_best_params
+
+    args = parse_args()
+    solver = ExpectimaxSolver(args.min, args.max, args.remove, args.players, max_entries=args.max_entries)
+    values = solver.solve(args.cubes)
+    print("Expected final score with optimal play (seat order from the first player to act):")
+    print("  " + " | ".join(f"{v:.3f}" for v in values))
+    solver.print_stats()
+
+    # How far are the trained strategies from optimal? One trained player against optimal opponents.
+    optimal = OptimalStrategy(max_entries=args.max_entries)
+    optimal.solvers[(args.min, args.max, args.max - args.min - args.remove, args.players)] = solver
+    print()
+    for strategy_cls in [LadderBuilderStrategy, RiskThresholdStrategy, CollectorStrategy,
+                         ChaoticStrategy, CubeConserverStrategy, OptimalStrategy]:
+        strategy = optimal if strategy_cls is OptimalStrategy else strategy_cls(**(load_best_params(strategy_cls) or {}))
+        total = 0
+        for _ in range(args.games):
+            players = [Player.Player("Tested", strategy)]
+            players += [Player.Player(f"Optimal{i}", optimal) for i in range(1, args.players)]
+            game = Game.Game(players, args.cubes, args.min, args.max, args.remove)
+            game.play()
+            total += players[0].score
+        print(f"{strategy.name:25} | Avg Score vs optimal opponents: {total / args.games:.3f}")
+    solver.print_stats()
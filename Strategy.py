@@ -1,8 +1,13 @@
 import Game
 import Player
 import random
+from array import array
 
 class Strategy:
+    # State features take_probability depends on (see compile). None = can't be compiled.
+    # Possible features: "number", "distance", "pile", "cubes"
+    table_features = None
+
     def __init__(self, **params):
         self.params = params
 
@@ -13,50 +18,201 @@ class Strategy:
     def make_choice(self, game: Game, player: Player):
         raise NotImplementedError
 
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number) -> float:
+        """Probability that make_choice takes the number, as a function of table_features.
+        distance is the distance to the nearest owned number, None if the player owns no
+        number within distance_horizon().
+        """
+        raise NotImplementedError
+
+    def distance_horizon(self) -> int:
+        """Largest distance to an owned number that take_probability tells apart"""
+        return 1
+
+    def compile(self, lowest_number: int, highest_number: int, max_cubes: int) -> "CompiledStrategy":
+        """Precompute take_probability for every state of a game config.
+        max_cubes is the total number of cubes in the game (bounds both pile and cubes).
+        Raises TypeError if the strategy has no table_features and ValueError if it looks
+        further than MAX_HORIZON numbers away; callers can catch these and keep using self.
+        """
+        return CompiledStrategy(self, lowest_number, highest_number, max_cubes)
+
+class CompiledStrategy(Strategy):
+    """A strategy turned into a lookup table over its table_features.
+    The distance feature is read as the owned bits in [num - horizon, num + horizon],
+    so the table index is a few shifts and the lookup returns the stored decision
+    (for stochastic strategies the take probability).
+    States outside the table fall back to the source strategy.
+    """
+
+    MAX_HORIZON = 6
+
+    def __init__(self, source: Strategy, lowest_number: int, highest_number: int, max_cubes: int):
+        if source.table_features is None:
+            raise TypeError(f"{source.name} can't be compiled")
+        super().__init__(**source.params)
+        self.source = source
+        self.lowest_number = lowest_number
+        horizon = max(source.distance_horizon(), 0) if "distance" in source.table_features else 0
+        if horizon > CompiledStrategy.MAX_HORIZON:
+            raise ValueError(f"{source.name} looks {horizon} numbers away, can't be compiled")
+        self.horizon = horizon
+        window_size = 1 << (2 * horizon + 1)
+
+        sizes = {"number": highest_number - lowest_number, "distance": window_size,
+                 "pile": max_cubes + 1, "cubes": max_cubes + 1}
+        strides = {}
+        stride = 1
+        for feature in reversed(source.table_features):
+            strides[feature] = stride
+            stride *= sizes[feature]
+        self.number_stride = strides.get("number", 0)
+        self.window_stride = strides.get("distance", 0)
+        self.window_mask = window_size - 1
+        self.pile_stride = strides.get("pile", 0)
+        self.cubes_stride = strides.get("cubes", 0)
+        self.max_cubes = max_cubes
+
+        def axis(feature):
+            return range(sizes[feature]) if feature in strides else [0]
+
+        table = array("d", bytes(8 * stride))
+        for n in axis("number"):
+            for window in axis("distance"):
+                distance = window_distance(window, horizon)
+                for p in axis("pile"):
+                    for c in axis("cubes"):
+                        index = (n * self.number_stride + window * self.window_stride
+                                 + p * self.pile_stride + c * self.cubes_stride)
+                        table[index] = source.take_probability(
+                            n + lowest_number, distance, p, c, lowest_number, highest_number)
+        self.table = table
+        # Deterministic entries as the choice itself, None where a random draw is needed
+        self.decisions = ["t" if p >= 1.0 else "p" if p <= 0.0 else None for p in table]
+
+    @property
+    def name(self):
+        return self.source.name
+
+    def make_choice(self, game: Game, player: Player):
+        num = game.num
+        index = (num - self.lowest_number) * self.number_stride
+        if self.window_stride:
+            index += (((player.mask << self.horizon) >> num) & self.window_mask) * self.window_stride
+        if self.pile_stride:
+            pile = game.pile
+            if pile > self.max_cubes:
+                return self.source.make_choice(game, player)
+            index += pile * self.pile_stride
+        if self.cubes_stride:
+            cubes = player.cubes
+            if cubes > self.max_cubes:
+                return self.source.make_choice(game, player)
+            index += cubes * self.cubes_stride
+
+        choice = self.decisions[index]
+        if choice is None:
+            return "t" if game.rng.random() < self.table[index] else "p"
+        return choice
+
+def window_distance(window: int, horizon: int):
+    """Distance from the middle bit of a (2 * horizon + 1)-bit window to the nearest set bit"""
+    for d in range(1, horizon + 1):
+        if (window >> (horizon - d)) & 1 or (window >> (horizon + d)) & 1:
+            return d
+    return None
+
+def clamp_probability(p) -> float:
+    return min(max(p, 0.0), 1.0)
+
+def get_strategy_class(name: str):
+    """Look up a Strategy subclass by its class name.
+    Used to rebuild strategies from picklable (name, params) pairs.
+    """
+    pending = [Strategy]
+    while pending:
+        cls = pending.pop()
+        if cls.__name__ == name:
+            return cls
+        pending.extend(cls.__subclasses__())
+    raise KeyError(f"Unknown strategy: {name}")
+
 class Simlple(Strategy):
+    table_features = ("distance", "pile")
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        if distance == 1:
+            return 1.0
+        return clamp_probability(0.03 * pile)
+
     def make_choice(s, game: Game, player: Player):
         num = game.num
 
         #Always take numbers adjacent to current numbers
-        for n in player.numbers:
-            if num == n+1 or num == n-1:
-                return "t"
+        if player.is_adjacent(num):
+            return "t"
 
         threshold_to_take = 0.03 * game.pile
-        p = random.uniform(0,1)
+        p = game.rng.uniform(0,1)
         if threshold_to_take > p: return "t"
         else: return "p"
     
 class LadderBuilderStrategy(Strategy):
+    table_features = ("distance", "pile")
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        if distance is None:
+            return 0.0
+        if distance <= self.params.get("gap_weight", 1):
+            return 1.0
+        if pile > self.params.get("pile_threshold", 1) and distance <= self.params.get("extension_gap", 2):
+            return 1.0
+        return 0.0
+
+    def distance_horizon(self):
+        return int(max(self.params.get("gap_weight", 1), self.params.get("extension_gap", 2)))
+
     def make_choice(self, game: Game, player: Player):
         num = game.num
         gap = self.params.get("gap_weight", 1)
         extension_gap = self.params.get("extension_gap", 2)
         pile_threshold = self.params.get("pile_threshold", 1)
 
-        for n in player.numbers:
-            if abs(n - num) <= gap:
-                return "t"
-        if game.pile > pile_threshold and any(abs(num - n) <= extension_gap for n in player.numbers):
+        if player.owns_within(num, gap):
+            return "t"
+        if game.pile > pile_threshold and player.owns_within(num, extension_gap):
             return "t"
         return "p"
 
 
 class CollectorStrategy(Strategy):
+    table_features = ("number", "distance")
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        if distance == 1:
+            return 1.0
+        return 1.0 if number < self.params.get("cutoff", (lowest_number + highest_number) // 2) else 0.0
+
     def make_choice(self, game: Game, player: Player):
         num = game.num
         #Always take numbers adjacent to current numbers
-        for n in player.numbers:
-            if num == n+1 or num == n-1:
-                return "t"
+        if player.is_adjacent(num):
+            return "t"
         cutoff = self.params.get("cutoff", (game.lowest_number + game.highest_number) // 2)
         if num < cutoff:
             return "t"
         return "p"
 
 class ChaoticStrategy(Strategy):
+    table_features = ()
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        yolo = clamp_probability(self.params.get("yolo_chance", 0.1))
+        pay = clamp_probability(self.params.get("pay_chance", 0.5))
+        return clamp_probability(yolo + 1.0 - max(yolo, pay))
+
     def make_choice(self, game: Game, player: Player):
-        r = random.random()
+        r = game.rng.random()
         yolo = self.params.get("yolo_chance", 0.1)
         pay = self.params.get("pay_chance", 0.5)
 
@@ -67,15 +223,21 @@ class ChaoticStrategy(Strategy):
         return "t"
 
 class RiskThresholdStrategy(Strategy):
+    table_features = ("distance", "pile")
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        if distance == 1:
+            return 1.0
+        return clamp_probability(self.params.get("risk_multiplier", 0.03) * pile)
+
     def make_choice(self, game: Game, player: Player):
         num = game.num
-        for n in player.numbers:
-            if abs(n - num) == 1:
-                return "t"
+        if player.is_adjacent(num):
+            return "t"
 
         risk_multiplier = self.params.get("risk_multiplier", 0.03)
         threshold_to_take = risk_multiplier * game.pile
-        if random.uniform(0, 1) < threshold_to_take:
+        if game.rng.uniform(0, 1) < threshold_to_take:
             return "t"
         return "p"
 
@@ -84,7 +246,7 @@ class ClusterLoverStrategy(Strategy):
         num = game.num
         if not player.numbers:
             return "p"
-        center = sum(player.numbers) / len(player.numbers)
+        center = player.number_sum / len(player.numbers)
         if abs(center - num) < self.params.get("cluster_radius", 3):
             return "t"
         return "p"
@@ -92,13 +254,19 @@ class ClusterLoverStrategy(Strategy):
 class ChainBuilderStrategy(Strategy):
     def make_choice(self, game: Game, player: Player):
         num = game.num
-        chains = sorted(player.numbers)
-        for i in range(1, len(chains)):
-            if chains[i] == chains[i-1] + 1 and (num == chains[i] + 1 or num == chains[i-1] - 1):
-                return "t"
+        # Extend a chain of at least two numbers from either end
+        if player.owns(num - 1) and player.owns(num - 2):
+            return "t"
+        if player.owns(num + 1) and player.owns(num + 2):
+            return "t"
         return "p"
 
 class PileSnatcherStrategy(Strategy):
+    table_features = ("pile",)
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        return 1.0 if pile >= self.params.get("snatch_threshold", 3) else 0.0
+
     def make_choice(self, game: Game, player: Player):
         pile_size = game.pile
         snatch_threshold = self.params.get("snatch_threshold", 3)
@@ -107,6 +275,13 @@ class PileSnatcherStrategy(Strategy):
         return "p"
 
 class CubeConserverStrategy(Strategy):
+    table_features = ("cubes", "pile")
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        if cubes <= self.params.get("low_cube_threshold", 2):
+            return 0.0
+        return 1.0 if pile >= self.params.get("pile_threshold", 2) else 0.0
+
     def make_choice(self, game: Game, player: Player):
         if player.cubes <= self.params.get("low_cube_threshold", 2):
             return "p"
@@ -115,9 +290,16 @@ class CubeConserverStrategy(Strategy):
         return "p"
 
 class GreedyLadderExtensionStrategy(Strategy):
+    table_features = ("distance", "pile")
+
+    def take_probability(self, number, distance, pile, cubes, lowest_number, highest_number):
+        if distance == 1:
+            return 1.0
+        return 1.0 if pile >= self.params.get("high_pile_threshold", 4) else 0.0
+
     def make_choice(self, game: Game, player: Player):
         num = game.num
-        if num in [n + 1 for n in player.numbers] or num in [n - 1 for n in player.numbers]:
+        if player.is_adjacent(num):
             return "t"
         if game.pile >= self.params.get("high_pile_threshold", 4):
             return "t"
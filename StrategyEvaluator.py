@@ -1,10 +1,12 @@
-import json
+import argparse
 import itertools
 from Strategy import *
 from Game import *
 import Player
-import random
-import os
+from statistics import NormalDist
+from Observers import TimingObserver, CounterObserver, print_report
+from DecisionLog import DecisionRecorder
+from ParamStore import get_param_store
 
 # === Load strategy configs ===
 STRATEGY_CONFIGS = [
@@ -40,55 +42,180 @@ GAME_CONFIG = {
 ROUNDS_PER_MATCH = 10
 PLAYERS_PER_GAME = 4
 
+# Adaptive mode: play a combination until every neighbouring pair in its ranking is
+# separated by its paired score difference. CONFIDENCE_Z is the confidence of one
+# test, the ranking is re-tested after every game so the z used is corrected for
+# all those looks (see sequential_z)
+ADAPTIVE_MIN_GAMES = 5
+ADAPTIVE_MAX_GAMES = 100
+CONFIDENCE_Z = 1.96
 
-def load_best_params(strategy_cls):
-    filename = f"best_params_{strategy_cls.__name__}.json"
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f"Missing file: {filename}")
-    with open(filename, "r") as f:
-        return json.load(f)
 
+class RunningStats:
+    """Running mean and variance (Welford)"""
+    __slots__ = ("n", "mean", "m2")
 
-def evaluate_strategies(strategies):
-    results = {s["name"]: {"total_score": 0, "wins": 0, "games": 0} for s in strategies}
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def stderr(self) -> float:
+        return (self.variance / self.n) ** 0.5 if self.n else 0.0
+
+
+def load_params(strategies):
+    """Saved params of every strategy config, {name: params}, from one query on the param store"""
+    store = get_param_store()
+    saved = store.load_all()
+    missing = [s["class"].__name__ for s in strategies if s["class"].__name__ not in saved]
+    if missing:
+        raise KeyError(f"No saved params for {', '.join(missing)} in {store.path}")
+    return {s["name"]: saved[s["class"].__name__] for s in strategies}
+
+
+def play_game(combo, rng=None, observers=None, params=None):
+    """Play one game with the strategies of combo, returns the players in seat order.
+    params is {name: params} from load_params (loaded here if not given).
+    """
+    if params is None:
+        params = load_params(combo)
+    players = []
+    for strat_info in combo:
+        strat = strat_info["class"](**params[strat_info["name"]])
+        players.append(Player.Player(
+            name=strat_info["name"],
+            played_by_human=False,
+            strategy=strat
+        ))
+
+    game = Game(players, GAME_CONFIG["cubes"], GAME_CONFIG["min"], GAME_CONFIG["max"], GAME_CONFIG["remove"],
+                rng=rng, observers=observers)
+    game.play()
+    return game.players
+
+
+def sequential_z(z, looks, comparisons=1) -> float:
+    """z that keeps the false separation rate of a single z-test at level z while
+    testing `comparisons` pairs after each of `looks` games (Bonferroni over all tests)
+    """
+    alpha = 2 * (1 - NormalDist().cdf(z))
+    return NormalDist().inv_cdf(1 - alpha / (2 * max(1, looks) * max(1, comparisons)))
+
+
+def ranking_settled(score_stats, diff_stats, z=CONFIDENCE_Z) -> bool:
+    """True if every neighbouring pair in the ranking by mean score is separated by
+    z standard errors of its paired difference
+    """
+    order = sorted(range(len(score_stats)), key=lambda i: score_stats[i].mean, reverse=True)
+    for a, b in zip(order, order[1:]):
+        diff = diff_stats[(min(a, b), max(a, b))]
+        if diff.n < 2 or abs(diff.mean) <= z * diff.stderr:
+            return False
+    return True
+
+
+def evaluate_strategies(strategies, seed=None, adaptive=False,
+                        min_games=ADAPTIVE_MIN_GAMES, max_games=ADAPTIVE_MAX_GAMES, z=CONFIDENCE_Z, observers=None):
+    """Play games for every combination of PLAYERS_PER_GAME strategies.
+    By default every combination gets ROUNDS_PER_MATCH games. With adaptive=True a
+    combination is played until its ranking is settled (see ranking_settled),
+    between min_games and max_games games, so close matchups get more games. The
+    stopping test uses sequential_z(z, ...), valid for testing after every game.
+    Each combination counts equally in the averages however many games it played
+    ("weight" is the number of combinations, "games" the games played).
+    With a seed, game i of combination c plays with spawn_rng(seed, c, i).
+    observers are attached to every game (see Observers).
+    """
+    results = {s["name"]: {"total_score": 0, "wins": 0, "games": 0, "weight": 0} for s in strategies}
+    results_games = []  # Games played per combination
+    params = load_params(strategies)
 
     combinations = list(itertools.combinations(strategies, PLAYERS_PER_GAME))
-    for combo in combinations:
-        for _ in range(ROUNDS_PER_MATCH):
-            players = []
-            for strat_info in combo:
-                params = load_best_params(strat_info["class"])
-                strat = strat_info["class"](**params)
-                players.append(Player.Player(
-                    name=strat_info["name"],
-                    played_by_human=False,
-                    strategy=strat
-                ))
-
-            game = Game(players, GAME_CONFIG["cubes"], GAME_CONFIG["min"], GAME_CONFIG["max"], GAME_CONFIG["remove"])
-            game.play()
+    stop_z = sequential_z(z, max_games - min_games + 1, PLAYERS_PER_GAME - 1)
+    for combo_index, combo in enumerate(combinations):
+        combo_results = {s["name"]: [0, 0] for s in combo}  # name -> [total score, wins]
+        score_stats = [RunningStats() for _ in combo]
+        diff_stats = {pair: RunningStats() for pair in itertools.combinations(range(len(combo)), 2)}
+        game_index = 0
+        while True:
+            if not adaptive and game_index >= ROUNDS_PER_MATCH:
+                break
+            if adaptive and game_index >= min_games and (
+                    game_index >= max_games or ranking_settled(score_stats, diff_stats, stop_z)):
+                break
+
+            rng = spawn_rng(seed, combo_index, game_index) if seed is not None else None
+            players = play_game(combo, rng, observers, params)
+            game_index += 1
+
+            scores = [player.score for player in players]
+            for stats, score in zip(score_stats, scores):
+                stats.add(score)
+            for (a, b), stats in diff_stats.items():
+                stats.add(scores[a] - scores[b])
 
             # Rank players by score
-            ranked = sorted(game.players, key=lambda p: p.score, reverse=True)
+            ranked = sorted(players, key=lambda p: p.score, reverse=True)
             for idx, player in enumerate(ranked):
                 name = player.strategy.__class__.__name__
-                results[name]["total_score"] += player.score
-                results[name]["games"] += 1
+                combo_results[name][0] += player.score
                 if idx == 0:
-                    results[name]["wins"] += 1
+                    combo_results[name][1] += 1
+        for name, (total_score, wins) in combo_results.items():
+            results[name]["total_score"] += total_score / game_index
+            results[name]["wins"] += wins / game_index
+            results[name]["games"] += game_index
+            results[name]["weight"] += 1
+        results_games.append(game_index)
 
+    total = sum(results_games)
+    print(f"Simulated {total} games over {len(combinations)} combinations "
+          f"(min {min(results_games, default=0)}, max {max(results_games, default=0)} per combination)")
     return results
 
 
 def print_leaderboard(results):
     print("\n=== Evaluation Results ===")
-    ranked = sorted(results.items(), key=lambda item: item[1]["total_score"] / item[1]["games"], reverse=True)
+    # Results with a "weight" hold per-combination averages (see evaluate_strategies)
+    ranked = sorted(results.items(), key=lambda item: item[1]["total_score"] / item[1].get("weight", item[1]["games"]),
+                    reverse=True)
     for name, data in ranked:
-        avg_score = data["total_score"] / data["games"]
-        win_rate = data["wins"] / data["games"]
+        weight = data.get("weight", data["games"])
+        avg_score = data["total_score"] / weight
+        win_rate = data["wins"] / weight
         print(f"{name:25} | Avg Score: {avg_score:.2f} | Win Rate: {win_rate:.2%} | Games: {data['games']}")
 
 
 if __name__ == "__main__":
-    results = evaluate_strategies(STRATEGY_CONFIGS)
+    parser = argparse.ArgumentParser(description="Evaluate the trained strategies against each other")
+    parser.add_argument("--adaptive", action="store_true", help="Stop each combination once its ranking is settled.")
+    parser.add_argument("--max-games", type=int, default=ADAPTIVE_MAX_GAMES, help="Max games per combination in adaptive mode.")
+    parser.add_argument("--seed", type=int, default=None, help="Root seed for reproducible games.")
+    parser.add_argument("--report", action="store_true", help="Print decision timing and game counters.")
+    parser.add_argument("--log", default=None, help="Append every decision to this binary decision log.")
+    args = parser.parse_args()
+
+    observers = [TimingObserver(), CounterObserver()] if args.report else []
+    if args.log:
+        observers.append(DecisionRecorder(args.log))
+    results = evaluate_strategies(STRATEGY_CONFIGS, seed=args.seed, adaptive=args.adaptive, max_games=args.max_games,
+                                  observers=observers)
     print_leaderboard(results)
+    for observer in observers:
+        if isinstance(observer, DecisionRecorder):
+            observer.close()
+    if observers:
+        print()
+        print_report(observers)
@@ -0,0 +1,142 @@
+import argparse
+import itertools
+import json
+import os
+import time
+
+from Main import ALL_STRATEGIES
+from Game import *
+from Strategy import get_strategy_class
+from Training import load_best_params, get_chunksize
+from StrategyEvaluator import GAME_CONFIG, PLAYERS_PER_GAME, print_leaderboard
+import Player
+
+CHECKPOINT_FILE = "tournament_checkpoint.json"
+CHECKPOINT_SECONDS = 10.0  # Write the checkpoint at most this often while tasks complete
+
+
+def get_tasks(entries, players_per_game: int, games: int, seed):
+    """One task per (combination, seat rotation), each plays `games` games.
+    entries are (class name, params). The key of a task identifies it in the checkpoint.
+    """
+    tasks = []
+    for combo_index, combo in enumerate(itertools.combinations(range(len(entries)), players_per_game)):
+        for rotation in range(players_per_game):
+            seating = combo[rotation:] + combo[:rotation]
+            key = f"{combo_index}/{rotation}"
+            tasks.append((key, [entries[i] for i in seating], games, seed))
+    return tasks
+
+
+def play_task(task):
+    """Play the games of one task (in a worker or in-process).
+    Game i of task key plays with spawn_rng(seed, key, i), so results do not depend
+    on the worker or the order tasks finish in.
+    Returns the key and {strategy name: [total score, wins, games]}.
+    """
+    key, seating, games, seed = task
+    totals = {}
+    for game_index in range(games):
+        players = [Player.Player(GENERIC_NAMES[seat % len(GENERIC_NAMES)], get_strategy_class(name)(**params))
+                   for seat, (name, params) in enumerate(seating)]
+        game = Game(players, GAME_CONFIG["cubes"], GAME_CONFIG["min"], GAME_CONFIG["max"], GAME_CONFIG["remove"],
+                    rng=spawn_rng(seed, key, game_index))
+        game.play()
+        winner = max(players, key=lambda p: p.score)  # First seat wins ties, as in StrategyEvaluator
+        for player in players:
+            total = totals.setdefault(player.strategy.name, [0, 0, 0])
+            total[0] += player.score
+            total[1] += player is winner
+            total[2] += 1
+    return key, totals
+
+
+def load_checkpoint(path: str, config: dict) -> dict:
+    """Finished tasks from a checkpoint of the same tournament config, or {}"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+    if checkpoint["config"] != config:
+        raise ValueError(f"{path} is a checkpoint of another tournament, remove it or pass another --checkpoint")
+    return checkpoint["done"]
+
+
+def save_checkpoint(path: str, config: dict, done: dict):
+    """Write to a temporary file and rename it, so a crash never leaves a partial checkpoint"""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"config": config, "done": done}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def run_tournament(entries, games: int = 10, players_per_game: int = PLAYERS_PER_GAME, seed: int = 0,
+                   workers: int = None, checkpoint: str = CHECKPOINT_FILE) -> dict:
+    """Round robin over all combinations of players_per_game entries, every combination
+    in all seat rotations. Finished tasks are checkpointed, rerunning with the same
+    arguments resumes where the last run stopped. Returns results in the format of
+    StrategyEvaluator.evaluate_strategies.
+    """
+    config = {"entries": entries, "games": games, "players_per_game": players_per_game,
+              "seed": seed, "game_config": GAME_CONFIG}
+    config = json.loads(json.dumps(config))  # Same form as when read back from the checkpoint
+    done = load_checkpoint(checkpoint, config) if checkpoint else {}
+    tasks = get_tasks(entries, players_per_game, games, seed)
+    pending = [task for task in tasks if task[0] not in done]
+    print(f"{len(tasks)} tasks ({len(tasks) * games} games), {len(tasks) - len(pending)} done in checkpoint")
+
+    start = last_save = time.perf_counter()
+    pool = None
+    if workers and workers > 1 and pending:
+        from multiprocessing import Pool
+        pool = Pool(workers)
+    try:
+        results = pool.imap_unordered(play_task, pending, get_chunksize(len(pending), workers)) if pool \
+            else map(play_task, pending)
+        for finished, (key, totals) in enumerate(results, 1):
+            done[key] = totals
+            now = time.perf_counter()
+            if checkpoint and (now - last_save >= CHECKPOINT_SECONDS or finished == len(pending)):
+                save_checkpoint(checkpoint, config, done)
+                last_save = now
+                print(f"{finished}/{len(pending)} tasks, {finished * games / (now - start):.0f} games/s")
+    except BaseException:
+        # Don't wait for queued tasks after an error or Ctrl-C
+        if pool is not None:
+            pool.terminate()
+        raise
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if checkpoint and pending:
+            save_checkpoint(checkpoint, config, done)
+
+    results = {name: {"total_score": 0, "wins": 0, "games": 0} for name, _ in entries}
+    for totals in done.values():
+        for name, (score, wins, n) in totals.items():
+            results[name]["total_score"] += score
+            results[name]["wins"] += wins
+            results[name]["games"] += n
+    return results
+
+
+def get_entries(strategy_classes) -> list:
+    """(class name, trained params) of every strategy, untrained ones play with defaults"""
+    return [(cls.__name__, load_best_params(cls) or {}) for cls in strategy_classes]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel, resumable round robin over all strategies")
+    parser.add_argument("--games", type=int, default=10, help="Games per combination and seat rotation (default = 10).")
+    parser.add_argument("--players", type=int, default=PLAYERS_PER_GAME, help=f"Players per game (default = {PLAYERS_PER_GAME}).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default = all cores).")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed of the tournament (default = 0).")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help=f"Checkpoint file (default = {CHECKPOINT_FILE}).")
+    args = parser.parse_args()
+
+    entries = get_entries(ALL_STRATEGIES)
+    results = run_tournament(entries, args.games, args.players, args.seed, args.workers, args.checkpoint)
+    print_leaderboard(results)
@@ -0,0 +1,550 @@
+from Game import *
+from Strategy import *
+
+import json
+import math
+import os
+import pickle
+import random
+from collections import OrderedDict
+
+from ParamStore import get_param_store
+
+CHECKPOINT_EVERY = 5  # Generations between GA checkpoints
+GA_GAME_CONFIG = {"cubes": 5, "min": 1, "max": 36, "remove": 3}
+
+
+def save_best_params(individual, metadata=None):
+	"""Save params as a new version in the param store (see ParamStore), with the
+	individual's score as fitness
+	"""
+	store = get_param_store()
+	version = store.save(individual["strategy_cls"].__name__, individual["params"],
+		individual.get("score"), metadata)
+	print(f"Saved best parameters to {store.path} (version {version})")
+
+def load_best_params(strategy_cls):
+	store = get_param_store()
+	params = store.load(strategy_cls.__name__)
+	if params is None:
+		print(f"No saved parameters found for {strategy_cls.__name__}")
+		return None
+	print(f"Loaded saved parameters for {strategy_cls.__name__} from {store.path}")
+	return params
+
+def get_checkpoint_filename(strategy_cls):
+	return f"ga_checkpoint_{strategy_cls.__name__}.pkl"
+
+def save_checkpoint(path, state):
+	"""Pickle state to a temporary file and rename it over path, so an interrupted
+	write never replaces the last good checkpoint
+	"""
+	tmp = path + ".tmp"
+	with open(tmp, "wb") as f:
+		pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmp, path)
+
+def load_checkpoint(path):
+	if not os.path.exists(path):
+		return None
+	with open(path, "rb") as f:
+		return pickle.load(f)
+
+def mutate(params, mutation_rate=0.1, clamp_ranges=None, rng=random):
+	new_params = {}
+	for k, v in params.items():
+		if isinstance(v, int):
+			delta = rng.choice([-1, 1])
+		elif isinstance(v, float):
+			delta = rng.uniform(-0.2, 0.2)
+		else:
+			delta = 0
+		new_val = v + delta if rng.random() < mutation_rate else v
+		if clamp_ranges and k in clamp_ranges:
+			min_val, max_val = clamp_ranges[k]
+			new_val = max(min_val, min(new_val, max_val))
+		new_params[k] = new_val
+	return new_params
+
+def evaluate_strategy(individual, opponents, game_config, rng=None):
+	players = []
+
+	# Main individual as first player
+	players.append(Player.Player("Agent", played_by_human=False,
+		strategy=individual["strategy_cls"](**individual["params"])))
+
+	# Add opponents
+	for i, op in enumerate(opponents):
+		strat = op["strategy_cls"](**op["params"])
+		players.append(Player.Player(f"Bot{i+1}", played_by_human=False, strategy=strat))
+
+	game = Game.Game(players, game_config["cubes"], game_config["min"],
+		game_config["max"], game_config["remove"], rng=rng)
+	
+	game.play()
+	return players[0].score  # Return Agent's score
+
+def get_payload(individual, opponents, game_config, game_seed):
+	"""Picklable description of one evaluation: strategies are sent by class name.
+	game_seed is the (root seed, *path) of the game's random stream, see spawn_rng.
+	"""
+	return (
+		individual["strategy_cls"].__name__,
+		individual["params"],
+		[(op["strategy_cls"].__name__, op["params"]) for op in opponents],
+		game_config,
+		game_seed,
+	)
+
+def evaluate_payload(payload):
+	"""Run evaluate_strategy for a payload from get_payload (in a worker or in-process).
+	The game gets its own random stream, so the result does not depend on which
+	process runs it or in what order.
+	"""
+	name, params, opponent_params, game_config, game_seed = payload
+	individual = {"strategy_cls": get_strategy_class(name), "params": params}
+	opponents = [{"strategy_cls": get_strategy_class(n), "params": p} for n, p in opponent_params]
+	return evaluate_strategy(individual, opponents, game_config, rng=spawn_rng(*game_seed))
+
+def play_table(payload):
+	"""Play one game of a mixed table, returns the score of every seat.
+	payload is ([(class name, params) per seat], game_config, game_seed).
+	"""
+	seating, game_config, game_seed = payload
+	players = [Player.Player(f"Seat{i+1}", played_by_human=False, strategy=get_strategy_class(name)(**params))
+		for i, (name, params) in enumerate(seating)]
+	game = Game.Game(players, game_config["cubes"], game_config["min"],
+		game_config["max"], game_config["remove"], rng=spawn_rng(*game_seed))
+	game.play()
+	return [player.score for player in players]
+
+def get_chunksize(n_tasks, workers):
+	# A few chunks per worker keeps dispatch overhead low while still balancing load
+	return max(1, math.ceil(n_tasks / (workers * 4)))
+
+def quantize_params(params, quantum):
+	"""Hashable form of params with floats rounded to multiples of quantum"""
+	return tuple(sorted(
+		(k, round(v / quantum) if isinstance(v, float) else v) for k, v in params.items()
+	))
+
+class FitnessCache:
+	"""Bounded LRU of fitness per evaluation: (strategy class, quantized params,
+	opponents, game config) -> running mean and count of the scores seen.
+	Keys with max_samples scores are served from the cache, others are simulated
+	again and the new score is folded into the mean.
+	"""
+
+	def __init__(self, max_entries=10000, max_samples=8, quantum=0.01):
+		self.max_entries = max_entries
+		self.max_samples = max_samples
+		self.quantum = quantum
+		self.entries = OrderedDict()  # key -> [mean, count]
+		self.reset_stats()
+
+	def reset_stats(self):
+		self.hits = 0  # Served from the cache
+		self.merges = 0  # Simulated and merged with earlier samples
+		self.misses = 0  # Seen for the first time
+
+	def key(self, individual, opponents, game_config):
+		return (
+			individual["strategy_cls"].__name__,
+			quantize_params(individual["params"], self.quantum),
+			tuple((op["strategy_cls"].__name__, quantize_params(op["params"], self.quantum)) for op in opponents),
+			tuple(sorted(game_config.items())),
+		)
+
+	def lookup(self, key):
+		"""Cached mean if the key has enough samples, otherwise None"""
+		entry = self.entries.get(key)
+		if entry is not None:
+			self.entries.move_to_end(key)
+			if entry[1] >= self.max_samples:
+				self.hits += 1
+				return entry[0]
+			self.merges += 1
+		else:
+			self.misses += 1
+		return None
+
+	def add(self, key, score) -> float:
+		"""Fold score into the mean of key and return the new mean.
+		Never evicts, call trim() once the batch is done.
+		"""
+		entry = self.entries.get(key)
+		if entry is None:
+			entry = self.entries[key] = [0.0, 0]
+		entry[1] += 1
+		entry[0] += (score - entry[0]) / entry[1]
+		return entry[0]
+
+	def trim(self, keep=()):
+		"""Evict least recently used entries down to max_entries, never the keys in keep"""
+		excess = len(self.entries) - self.max_entries
+		if excess > 0:
+			for key in [key for key in self.entries if key not in keep][:excess]:
+				del self.entries[key]
+
+	def mean(self, key) -> float:
+		return self.entries[key][0]
+
+	@property
+	def hit_rate(self) -> float:
+		lookups = self.hits + self.merges + self.misses
+		return self.hits / lookups if lookups else 0.0
+
+def evaluate_population(population, game_config, rng, game_seed, pool=None, workers=None, cache=None):
+	"""Score every individual against 3 opponents sampled from the population.
+	Game i plays with spawn_rng(*game_seed, i). With a cache, repeated evaluations
+	are served from (or merged into) the cache.
+	"""
+	payloads = []
+	pending = []  # (individual, cache key) of the payloads
+	keys = set()  # cache keys of this batch, they are not evicted before it is scored
+	for i, individual in enumerate(population):
+		opponents = rng.sample(population, 3)
+		key = None
+		if cache is not None:
+			key = cache.key(individual, opponents, game_config)
+			keys.add(key)
+			cached = cache.lookup(key)
+			if cached is not None:
+				individual["score"] = cached
+				continue
+		payloads.append(get_payload(individual, opponents, game_config, (*game_seed, i)))
+		pending.append((individual, key))
+
+	if pool is not None:
+		scores = pool.map(evaluate_payload, payloads, chunksize=get_chunksize(len(payloads), workers))
+	else:
+		scores = list(map(evaluate_payload, payloads))
+	means = {}  # cache key -> mean including this generation's samples
+	for (individual, key), score in zip(pending, scores):
+		individual["score"] = score
+		if cache is not None:
+			means[key] = cache.add(key, score)
+	if cache is not None:
+		# Individuals sharing a key all get the mean including this generation's samples
+		for individual, key in pending:
+			individual["score"] = means[key]
+		cache.trim(keys)
+
+def race_population(population, game_config, rng, game_seed, budget, pool=None, workers=None):
+	"""Race for the top half (the parents of the next generation) with a fixed budget
+	of games: every round splits its share of the budget over the individuals still
+	racing, then half of those that don't fit in the top half drop out, until only
+	the top half is left. Game j of individual i in round r plays with
+	spawn_rng(*game_seed, r, i, j) against 3 opponents sampled from the population.
+	Games a round can't split evenly are carried over to the next rounds, so at most
+	budget games are played. Sets "score" (mean), "games" and "rounds" (rounds
+	survived, the top half gets one more) of every individual and returns the
+	number of games played.
+	"""
+	if budget < len(population):
+		raise ValueError(f"A budget of {budget} games can't give each of {len(population)} individuals a game")
+	keep = max(1, len(population) // 2)
+	sizes = []  # Individuals racing in each round
+	size = len(population)
+	while size > keep:
+		sizes.append(size)
+		size -= math.ceil((size - keep) / 2)
+	sizes.append(keep)
+
+	racing = list(range(len(population)))
+	totals = [0.0] * len(population)
+	for individual in population:
+		individual["games"] = 0
+		individual["rounds"] = 0
+	remaining = budget
+	rounds = len(sizes) - 1
+	for r in range(rounds):
+		games = min(max(1, remaining // (rounds - r) // len(racing)), remaining // len(racing))
+		if games == 0:
+			break
+		remaining -= games * len(racing)
+		payloads = []
+		for i in racing:
+			for j in range(games):
+				opponents = rng.sample(population, 3)
+				payloads.append(get_payload(population[i], opponents, game_config, (*game_seed, r, i, j)))
+		if pool is not None:
+			scores = pool.map(evaluate_payload, payloads, chunksize=get_chunksize(len(payloads), workers))
+		else:
+			scores = list(map(evaluate_payload, payloads))
+		for k, i in enumerate(racing):
+			totals[i] += sum(scores[k * games:(k + 1) * games])
+			individual = population[i]
+			individual["games"] += games
+			individual["score"] = totals[i] / individual["games"]
+			individual["rounds"] = r + 1
+		racing.sort(key=lambda i: population[i]["score"], reverse=True)
+		racing = racing[:sizes[r + 1]]
+	if len(racing) == keep:
+		for i in racing:
+			population[i]["rounds"] += 1
+	return sum(individual["games"] for individual in population)
+
+def genetic_algorithm(strategy_cls, param_template, population_size=10, generations=100, seed=None, workers=None,
+		cache_size=10000, cache_samples=8, checkpoint=None, checkpoint_every=CHECKPOINT_EVERY,
+		games_per_generation=None):
+	"""Evolve params for strategy_cls.
+	workers > 1 evaluates each generation on a process pool that is kept for the whole run.
+	Game i of generation gen plays with spawn_rng(seed, gen, i).
+	Fitness is cached per (params, opponents, config) for up to cache_samples games,
+	cache_size=0 turns the cache off.
+	With games_per_generation, individuals are raced (see race_population) instead
+	of scored from one game each, and ranked by the rounds they survived first.
+	With a checkpoint path the full state (population, histories, rng state and cache)
+	is saved every checkpoint_every generations. Calling again with the same arguments
+	continues from the checkpoint exactly as if the run had not stopped. The
+	checkpoint is removed when the run finishes.
+	"""
+	if 0 < cache_size < population_size:
+		raise ValueError(f"cache_size ({cache_size}) must be 0 or at least population_size ({population_size})")
+	run_config = {
+		"strategy": strategy_cls.__name__,
+		"param_template": param_template,
+		"population_size": population_size,
+		"seed": seed,
+		"cache": (cache_size, cache_samples),
+		"games_per_generation": games_per_generation,
+	}
+	state = load_checkpoint(checkpoint) if checkpoint else None
+	if state is not None:
+		if state["config"] != run_config:
+			raise ValueError(f"{checkpoint} belongs to another run, remove it to start over")
+		return resume_genetic_algorithm(state, strategy_cls, param_template, generations, workers,
+			checkpoint, checkpoint_every)
+
+	rng = random.Random(seed)
+	root_seed = seed if seed is not None else rng.getrandbits(64)
+
+	seed_params = load_best_params(strategy_cls)
+	population = []
+
+	if seed_params:
+		for _ in range(int(population_size * 0.5)):
+			population.append({
+				"strategy_cls": strategy_cls,
+				"params": seed_params,
+				"score": 0
+			})
+
+	while len(population) < population_size:
+		population.append(random_individual(strategy_cls, param_template, rng))
+
+	state = {
+		"config": run_config,
+		"generation": 0,
+		"population": population,
+		"param_history": {key: [] for key in param_template},
+		"score_history": [],
+		"rng": rng,
+		"root_seed": root_seed,
+		"cache": FitnessCache(cache_size, cache_samples) if cache_size and not games_per_generation else None,
+	}
+	return resume_genetic_algorithm(state, strategy_cls, param_template, generations, workers,
+		checkpoint, checkpoint_every)
+
+def reproduce(top_half, strategy_cls, param_template, population_size, rng):
+	"""Next generation: mutated copies of random parents from top_half"""
+	new_gen = []
+	while len(new_gen) < population_size:
+		parent = rng.choice(top_half)
+		child_params = mutate(parent["params"], mutation_rate=0.3, clamp_ranges=param_template, rng=rng)
+		new_gen.append({
+			"strategy_cls": strategy_cls,
+			"params": child_params,
+			"score": 0
+		})
+	return new_gen
+
+def random_individual(strategy_cls, param_template, rng):
+	return {
+		"strategy_cls": strategy_cls,
+		"params": {k: rng.uniform(*v) if isinstance(v, tuple) else v for k, v in param_template.items()},
+		"score": 0
+	}
+
+def resume_genetic_algorithm(state, strategy_cls, param_template, generations, workers, checkpoint, checkpoint_every):
+	"""Run the generations of a genetic_algorithm state from state["generation"] on.
+	Returns the best individual of the last generation (with its score) and the histories.
+	"""
+	population = state["population"]
+	population_size = len(population)
+	param_history = state["param_history"]
+	score_history = state["score_history"]
+	rng = state["rng"]
+	root_seed = state["root_seed"]
+	cache = state["cache"]
+	budget = state["config"].get("games_per_generation")
+	if state["generation"]:
+		print(f"Resuming {strategy_cls.__name__} from generation {state['generation'] + 1} ({checkpoint})")
+
+	game_config = GA_GAME_CONFIG
+	pool = None
+	if workers and workers > 1:
+		from multiprocessing import Pool  # Only paid for when a pool is used
+		pool = Pool(workers)
+	try:
+		for gen in range(state["generation"], generations):
+			if cache is not None:
+				cache.reset_stats()
+			if budget:
+				used = race_population(population, game_config, rng, (root_seed, gen), budget, pool, workers)
+				population.sort(key=lambda ind: (ind["rounds"], ind["score"]), reverse=True)
+			else:
+				evaluate_population(population, game_config, rng, (root_seed, gen), pool, workers, cache)
+				population.sort(key=lambda ind: ind["score"], reverse=True)
+			top_half = population[:population_size // 2]
+
+			# Track best parameters and score
+			best_params = top_half[0]["params"]
+			for key in param_template:
+				param_history[key].append(best_params[key])
+			score_history.append(top_half[0]["score"])
+			state["best"] = top_half[0]
+
+			# Games each individual played, best ranked first
+			games_text = f" Games = {[ind['games'] for ind in population]} ({used}/{budget})" if budget else ""
+			population = reproduce(top_half, strategy_cls, param_template, population_size, rng)
+			cache_text = "" if cache is None else f" Cache hits = {cache.hit_rate:.0%} ({cache.hits} hit, {cache.merges} merged, {cache.misses} new)"
+			print(f"Generation {gen+1}: Best Score = {top_half[0]['score']:.2f} Params = {top_half[0]['params']}{cache_text}{games_text}")
+
+			if checkpoint and (gen + 1) % checkpoint_every == 0:
+				state["generation"] = gen + 1
+				state["population"] = population
+				save_checkpoint(checkpoint, state)
+	except BaseException:
+		# Don't wait for queued tasks after an error or Ctrl-C
+		if pool is not None:
+			pool.terminate()
+		raise
+	finally:
+		if pool is not None:
+			pool.close()
+			pool.join()
+
+	if checkpoint and os.path.exists(checkpoint):
+		os.remove(checkpoint)
+	# The best evaluated individual of the last generation, not an unscored child
+	return state.get("best", population[0]), param_history, score_history
+
+def coevolve(configs, population_size=10, generations=50, games_per_individual=4, seed=None, workers=None,
+		players_per_game=4):
+	"""Evolve the params of every strategy config (see Arena2.STRATEGY_TRAINING_CONFIGS)
+	together. Each generation all individuals are shuffled into mixed tables
+	games_per_individual times and every game credits its score to every seat, so
+	strategies train against the current field. When the field doesn't fill the last
+	table, it is completed with extra individuals whose seats are not credited. Game j of generation gen plays with
+	spawn_rng(seed, gen, j). Each class keeps its top half and refills it with
+	mutated copies, like genetic_algorithm.
+	Returns {name: (best individual, param_history, score_history)}.
+	"""
+	if len(configs) * population_size < players_per_game:
+		raise ValueError(f"Co-evolution needs at least {players_per_game} individuals to fill a table")
+	rng = random.Random(seed)
+	root_seed = seed if seed is not None else rng.getrandbits(64)
+	populations = {}
+	for config in configs:
+		strategy_cls, param_template = config["class"], config["param_template"]
+		seed_params = load_best_params(strategy_cls)
+		population = [{"strategy_cls": strategy_cls, "params": seed_params, "score": 0}
+			for _ in range(int(population_size * 0.5) if seed_params else 0)]
+		while len(population) < population_size:
+			population.append(random_individual(strategy_cls, param_template, rng))
+		populations[config["name"]] = population
+	histories = {config["name"]: ({key: [] for key in config["param_template"]}, []) for config in configs}
+	bests = {}
+
+	pool = None
+	if workers and workers > 1:
+		from multiprocessing import Pool  # Only paid for when a pool is used
+		pool = Pool(workers)
+	try:
+		for gen in range(generations):
+			field = [individual for population in populations.values() for individual in population]
+			for individual in field:
+				individual["score"] = 0
+				individual["games"] = 0
+			tables = []  # (seated individuals, how many of them are credited)
+			for _ in range(games_per_individual):
+				order = rng.sample(field, len(field))
+				for i in range(0, len(order), players_per_game):
+					table = order[i:i + players_per_game]
+					credited = len(table)
+					if credited < players_per_game:
+						# Fill the last table with uncredited extras so everyone plays
+						table += rng.sample(order[:i], players_per_game - credited)
+					tables.append((table, credited))
+			payloads = [([(ind["strategy_cls"].__name__, ind["params"]) for ind in table], GA_GAME_CONFIG, (root_seed, gen, j))
+				for j, (table, _) in enumerate(tables)]
+			if pool is not None:
+				results = pool.map(play_table, payloads, chunksize=get_chunksize(len(payloads), workers))
+			else:
+				results = list(map(play_table, payloads))
+			samples = 0
+			for (table, credited), scores in zip(tables, results):
+				for individual, score in zip(table[:credited], scores):
+					individual["score"] += score
+					individual["games"] += 1
+				samples += credited
+			for individual in field:
+				individual["score"] /= individual["games"]
+
+			print(f"Generation {gen+1}: {len(tables)} games, {samples} fitness samples")
+			for config in configs:
+				name = config["name"]
+				population = populations[name]
+				population.sort(key=lambda ind: ind["score"], reverse=True)
+				top_half = population[:population_size // 2]
+				param_history, score_history = histories[name]
+				for key in config["param_template"]:
+					param_history[key].append(top_half[0]["params"][key])
+				score_history.append(top_half[0]["score"])
+				bests[name] = top_half[0]
+				print(f"  {name:25} Best Score = {top_half[0]['score']:.2f} Params = {top_half[0]['params']}")
+				populations[name] = reproduce(top_half, config["class"], config["param_template"], population_size, rng)
+	except BaseException:
+		# Don't wait for queued tasks after an error or Ctrl-C
+		if pool is not None:
+			pool.terminate()
+		raise
+	finally:
+		if pool is not None:
+			pool.close()
+			pool.join()
+
+	return {name: (bests[name], *histories[name]) for name in bests}
+
+def plot_history(param_history, score_history, title=None):
+	"""Plot parameter and best score evolution (imports matplotlib on first use)"""
+	import matplotlib.pyplot as plt
+
+	prefix = f"{title} - " if title else ""
+
+	# === Plot parameter evolution ===
+	plt.figure(figsize=(10, 6))
+	for param, values in param_history.items():
+		plt.plot(values, label=param)
+
+	plt.xlabel("Generation")
+	plt.ylabel("Parameter Value")
+	plt.title(f"{prefix}Evolution of Parameters Over Generations")
+	plt.legend()
+	plt.grid(True)
+	plt.tight_layout()
+	plt.show()
+
+	# === Plot score evolution ===
+	plt.figure(figsize=(10, 4))
+	plt.plot(score_history, label="Best Score", color="black")
+	plt.xlabel("Generation")
+	plt.ylabel("Score")
+	plt.title(f"{prefix}Best Agent Score Over Generations")
+	plt.grid(True)
+	plt.tight_layout()
+	plt.show()
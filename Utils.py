@@ -46,9 +46,20 @@ def color_text(color, text):
     reset_code = ANSI_COLORS["reset"]
     return f"{color_code}{text}{reset_code}"
 
+def spawn_rng(root_seed, *path) -> random.Random:
+    """
+    Independent random stream for e.g. one game of a run: spawn_rng(root_seed, game_index).
+    The stream only depends on the root seed and the path, so any game can be
+    replayed on its own, in any process and in any order.
+    """
+    key = "/".join(str(part) for part in (root_seed, *path))
+    return random.Random(key)  # str seeds are hashed with sha512, stable across runs
+
+CLEAR_SCREEN = "\033[2J\033[H"  # Clear the console and move the cursor to the top left
+
 def clear():
     """
     Clear the console. 
     """
-    print("\033[2J\033[H", end="")
+    print(CLEAR_SCREEN, end="")
 